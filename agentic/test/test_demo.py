@@ -2,31 +2,44 @@
 Example script to test the agentic RAG system.
 Run this after starting the application with: python run.py
 """
-import requests
-import json
-import time
+import argparse
+import asyncio
+import sys
+import httpx
+import orjson
 
 # Base URL
 BASE_URL = "http://localhost:8000"
 
+# HTTP/2 multiplexes concurrent requests over one connection; needs the `h2` package
+# (httpx[http2]). Without it we fall back to HTTP/1.1 keep-alive on the same client.
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+
+def format_section(title):
+    """Build a formatted section header."""
+    return f"\n{'=' * 60}\n {title}\n{'=' * 60}\n"
+
 
 def print_section(title):
-    """Print a formatted section header."""
-    print("\n" + "=" * 60)
-    print(f" {title}")
-    print("=" * 60)
+    """Print a formatted section header in a single write."""
+    sys.stdout.write(format_section(title))
 
 
-def check_health():
+async def check_health(client):
     """Check if the API is healthy."""
     print_section("Health Check")
-    response = requests.get(f"{BASE_URL}/health")
-    print(json.dumps(response.json(), indent=2))
+    response = await client.get("/health")
+    print(orjson.dumps(response.json(), option=orjson.OPT_INDENT_2).decode())
     return response.status_code == 200
 
 
-def upload_sample_documents():
-    """Upload sample documents to the vector database."""
+async def upload_sample_documents(client):
+    """Upload sample documents to the vector database concurrently."""
     print_section("Uploading Sample Documents")
     
     documents = [
@@ -98,9 +111,13 @@ Core concepts:
         }
     ]
     
+    # Uploads are independent of each other, so issue them all at once
+    responses = await asyncio.gather(
+        *[client.post("/documents/upload", json=doc) for doc in documents]
+    )
+    
     uploaded_ids = []
-    for doc in documents:
-        response = requests.post(f"{BASE_URL}/documents/upload", json=doc)
+    for doc, response in zip(documents, responses):
         if response.status_code == 201:
             result = response.json()
             uploaded_ids.append(result["document_id"])
@@ -113,24 +130,29 @@ Core concepts:
     return uploaded_ids
 
 
-def list_documents():
+async def list_documents(client):
     """List all documents in the database."""
     print_section("Listing All Documents")
-    response = requests.get(f"{BASE_URL}/documents/list")
+    response = await client.get("/documents/list")
     data = response.json()
-    print(f"Total documents: {data['total']}")
+    
+    # Buffer the listing and emit it with one write
+    out = [f"Total documents: {data['total']}\n"]
     for doc in data['documents']:
-        print(f"\n- {doc['title']}")
-        print(f"  ID: {doc['document_id']}")
-        print(f"  Type: {doc['document_type']}")
-        print(f"  Words: {doc['word_count']}")
+        out.append(
+            f"\n- {doc['title']}\n"
+            f"  ID: {doc['document_id']}\n"
+            f"  Type: {doc['document_type']}\n"
+            f"  Words: {doc['word_count']}\n"
+        )
+    sys.stdout.write("".join(out))
 
 
-def search_documents(query):
+async def search_documents(client, query):
     """Search for documents."""
     print_section(f"Searching Documents: '{query}'")
-    response = requests.post(
-        f"{BASE_URL}/documents/search",
+    response = await client.post(
+        "/documents/search",
         json={"query": query, "limit": 3}
     )
     data = response.json()
@@ -141,13 +163,10 @@ def search_documents(query):
         print(f"   Preview: {result['content'][:150]}...")
 
 
-def query_agent(query, use_web=True, use_vector=True):
+async def query_agent(client, query, use_web=True, use_vector=True, description=None):
     """Query the agentic RAG system."""
-    print_section(f"Agent Query: '{query}'")
-    print(f"Web Search: {use_web}, Vector Search: {use_vector}\n")
-    
-    response = requests.post(
-        f"{BASE_URL}/agent/query",
+    response = await client.post(
+        "/agent/query",
         json={
             "query": query,
             "use_web_search": use_web,
@@ -157,84 +176,109 @@ def query_agent(query, use_web=True, use_vector=True):
     
     data = response.json()
     
-    print("🤖 AGENT ANSWER:")
-    print("-" * 60)
-    print(data['answer'])
-    print("-" * 60)
+    # Buffer the whole report and write it once the response arrives,
+    # so concurrent queries don't interleave their output
+    out = []
+    if description:
+        out.append(f"\n📝 {description}\n")
+    out.append(format_section(f"Agent Query: '{query}'"))
+    out.append(f"Web Search: {use_web}, Vector Search: {use_vector}\n\n")
     
-    print(f"\n⏱️ Execution time: {data['execution_time']:.2f}s")
+    out.append("🤖 AGENT ANSWER:\n")
+    out.append("-" * 60 + "\n")
+    out.append(f"{data['answer']}\n")
+    out.append("-" * 60 + "\n")
+    
+    out.append(f"\n⏱️ Execution time: {data['execution_time']:.2f}s\n")
     
     if data['sources']:
-        print("\n📚 SOURCES USED:")
+        out.append("\n📚 SOURCES USED:\n")
         for source in data['sources']:
-            print(f"  - {source['type']}: {source['query']}")
+            out.append(f"  - {source['type']}: {source['query']}\n")
     
     if data['agent_steps']:
-        print(f"\n🔍 AGENT STEPS: ({len(data['agent_steps'])} steps)")
+        out.append(f"\n🔍 AGENT STEPS: ({len(data['agent_steps'])} steps)\n")
         for i, step in enumerate(data['agent_steps'], 1):
-            print(f"  {i}. Tool: {step['tool']}")
-            print(f"     Input: {step['tool_input']}")
+            out.append(f"  {i}. Tool: {step['tool']}\n")
+            out.append(f"     Input: {step['tool_input']}\n")
+    
+    sys.stdout.write("".join(out))
 
 
-def run_demo():
-    """Run the complete demo."""
+async def run_demo(pause=False):
+    """
+    Run the complete demo.
+    
+    Args:
+        pause: Insert short pauses between phases for readability (off by default)
+    """
+    async def pause_for(seconds):
+        if pause:
+            await asyncio.sleep(seconds)
+    
     print("\n" + "🚀" * 30)
     print("  AGENTIC RAG SYSTEM DEMO")
     print("🚀" * 30)
     
-    # Check health
-    if not check_health():
-        print("\n❌ Application is not healthy. Please start it with: python run.py")
-        return
-    
-    # Upload sample documents
-    uploaded_ids = upload_sample_documents()
-    
-    if not uploaded_ids:
-        print("\n⚠️ No documents uploaded. Continuing with existing documents...")
-    
-    time.sleep(1)
-    
-    # List documents
-    list_documents()
-    
-    time.sleep(1)
-    
-    # Search documents
-    search_documents("machine learning algorithms")
-    
-    time.sleep(1)
-    
-    # Agent queries
-    queries = [
-        {
-            "query": "What are Python best practices?",
-            "use_web": False,
-            "use_vector": True,
-            "description": "Vector search only - from our documents"
-        },
-        {
-            "query": "What is the latest Python version released in 2024?",
-            "use_web": True,
-            "use_vector": False,
-            "description": "Web search only - current information"
-        },
-        {
-            "query": "Explain machine learning and compare it with recent AI developments",
-            "use_web": True,
-            "use_vector": True,
-            "description": "Both tools - combine internal knowledge with current info"
-        }
-    ]
-    
-    for query_info in queries:
-        time.sleep(2)
-        print(f"\n📝 {query_info['description']}")
-        query_agent(
-            query_info["query"],
-            use_web=query_info["use_web"],
-            use_vector=query_info["use_vector"]
-        )
+    async with httpx.AsyncClient(base_url=BASE_URL, http2=HTTP2_ENABLED, timeout=120) as client:
+        # Check health
+        if not await check_health(client):
+            print("\n❌ Application is not healthy. Please start it with: python run.py")
+            return
+        
+        # Upload sample documents
+        uploaded_ids = await upload_sample_documents(client)
+        
+        if not uploaded_ids:
+            print("\n⚠️ No documents uploaded. Continuing with existing documents...")
+        
+        await pause_for(1)
+        
+        # List documents
+        await list_documents(client)
+        
+        await pause_for(1)
+        
+        # Search documents
+        await search_documents(client, "machine learning algorithms")
+        
+        await pause_for(1)
+        
+        # Agent queries
+        queries = [
+            {
+                "query": "What are Python best practices?",
+                "use_web": False,
+                "use_vector": True,
+                "description": "Vector search only - from our documents"
+            },
+            {
+                "query": "What is the latest Python version released in 2024?",
+                "use_web": True,
+                "use_vector": False,
+                "description": "Web search only - current information"
+            },
+            {
+                "query": "Explain machine learning and compare it with recent AI developments",
+                "use_web": True,
+                "use_vector": True,
+                "description": "Both tools - combine internal knowledge with current info"
+            }
+        ]
+        
+        await pause_for(2)
+        
+        # Queries don't depend on each other, so run them concurrently
+        await asyncio.gather(*[
+            query_agent(
+                client,
+                query_info["query"],
+                use_web=query_info["use_web"],
+                use_vector=query_info["use_vector"],
+                description=query_info["description"]
+            )
+            for query_info in queries
+        ])
     
     print_section("Demo Complete!")
     print("✅ All tests passed successfully!")
@@ -245,9 +289,13 @@ def run_demo():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agentic RAG system demo")
+    parser.add_argument("--pause", action="store_true", help="Pause between demo phases for readability")
+    args = parser.parse_args()
+    
     try:
-        run_demo()
-    except requests.exceptions.ConnectionError:
+        asyncio.run(run_demo(pause=args.pause))
+    except httpx.ConnectError:
         print("\n❌ Cannot connect to the API.")
         print("Please make sure:")
         print("1. Weaviate is running: docker-compose up -d")
@@ -2,19 +2,110 @@
 # collection management endpoints.
 # Handles CRUD operations for Weaviate collections.
 
-from fastapi import APIRouter, HTTPException, status # FastAPI router and exceptions
-import weaviate.classes as wvc # Weaviate vector classes 
-from weaviate.classes.config import Property, DataType
-from app.db import get_weaviate_client
+import hashlib # Hashing for ETag generation
+import logging # Background task reporting
+import re # Collection name validation
+from typing import Dict, Iterator, List
+import orjson # Fast JSON serialization
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status # FastAPI router and exceptions
+from fastapi.responses import StreamingResponse # Chunked responses for large listings
+from app.db import (
+    TICKET_PROPERTY_NAMES,
+    get_weaviate_client,
+    is_collection_not_found,
+    ticket_properties,
+    ticket_vector_index_config,
+    weaviate_manager,
+)
+from app.services.ai_service import ai_service
+from app.services.proximity_cache import proximity_cache
+from app.services.response_cache import response_cache
+from app.services.ticket_service import ticket_service
 from app.core.config import settings
 
 router = APIRouter(prefix="/api/v1/collections", tags=["Collections"])
+logger = logging.getLogger(__name__)
+
+# Endpoints are plain `def`: FastAPI runs them in its threadpool, so the blocking
+# sync Weaviate client doesn't stall the event loop for other requests.
+
+# Weaviate collection (class) naming rule. Weaviate upper-cases the first letter
+# itself, so a lowercase start is accepted here.
+_CLASS_NAME_RE = re.compile(r"^[A-Za-z][_0-9A-Za-z]{0,254}$")
+
+# Above this many collections, list_collections streams its body instead of buffering it
+_STREAM_THRESHOLD = 100
+
+
+def _validate_collection_name(collection_name: str):
+    """Reject names Weaviate would refuse, before spending a round-trip on them."""
+    if not _CLASS_NAME_RE.match(collection_name):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid collection name '{collection_name}'. Use letters, digits and underscores, starting with a letter."
+        )
+
+
+def _etag_response(request: Request, payload: Dict) -> Response:
+    """
+    Serialize payload with a strong ETag, honouring the client's If-None-Match.
+    Returns an empty 304 when the client already holds the current representation.
+    """
+    body = orjson.dumps(payload)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "public, max-age=3"}
+    )
+
+
+def _collection_entry(weaviate_client, collection_name: str) -> Dict:
+    """Build the listing entry (name + document count) for a single collection."""
+    try:
+        # Get collection reference
+        collection = weaviate_client.collections.get(collection_name)
+        
+        # Get document count for this collection
+        result = collection.aggregate.over_all(total_count=True)
+        
+        return {
+            "name": collection_name,
+            "document_count": result.total_count
+        }
+    except Exception as e:
+        # If count fails for a collection, add it with error
+        return {
+            "name": collection_name,
+            "document_count": 0,
+            "error": str(e)
+        }
+
+
+def _stream_collection_list(weaviate_client, collection_names: List[str]) -> Iterator[bytes]:
+    """
+    Yield the list_collections JSON body one collection at a time.
+    Starlette runs sync iterators in its threadpool, so the blocking count
+    calls don't stall the event loop while encoding overlaps with transfer.
+    """
+    yield b'{"total_collections":%d,"status":"success","collections":[' % len(collection_names)
+    for i, collection_name in enumerate(collection_names):
+        entry = orjson.dumps(_collection_entry(weaviate_client, collection_name))
+        yield entry if i == 0 else b"," + entry
+    yield b"]}"
 
 
 @router.get("")
-async def list_collections():
+def list_collections(request: Request, weaviate_client=Depends(get_weaviate_client)):
     """
     List all available collections in Weaviate vector database.
+    Supports conditional requests via ETag / If-None-Match (304 when unchanged).
+    Very large schemas are streamed instead (no ETag, since the body isn't buffered).
     
     Returns:
         Dict: List of all collection names with their counts
@@ -22,8 +113,6 @@ async def list_collections():
     Raises:
         HTTPException: If query fails
     """
-    weaviate_client = get_weaviate_client()
-    
     try:
         # Check if Weaviate client is initialized
         if weaviate_client is None:
@@ -35,38 +124,27 @@ async def list_collections():
         # Get all collections from Weaviate schema
         collections = weaviate_client.collections.list_all()
         
-        # Create list to store collection information
-        collection_list = []
+        collection_names = list(collections)
+        
+        # Stream large listings so peak memory stays at a single entry
+        if len(collection_names) > _STREAM_THRESHOLD:
+            return StreamingResponse(
+                _stream_collection_list(weaviate_client, collection_names),
+                media_type="application/json"
+            )
         
-        # Iterate through each collection and get its count
-        for collection_name in collections:
-            try:
-                # Get collection reference
-                collection = weaviate_client.collections.get(collection_name)
-                
-                # Get document count for this collection
-                result = collection.aggregate.over_all(total_count=True)
-                count = result.total_count
-                
-                # Add to list
-                collection_list.append({
-                    "name": collection_name,
-                    "document_count": count
-                })
-            except Exception as e:
-                # If count fails for a collection, add it with error
-                collection_list.append({
-                    "name": collection_name,
-                    "document_count": 0,
-                    "error": str(e)
-                })
+        # Get each collection's count
+        collection_list = [
+            _collection_entry(weaviate_client, collection_name)
+            for collection_name in collection_names
+        ]
         
         # Return all collections with their counts
-        return {
+        return _etag_response(request, {
             "total_collections": len(collection_list),
             "collections": collection_list,
             "status": "success"
-        }
+        })
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -80,9 +158,10 @@ async def list_collections():
 
 
 @router.get("/{collection_name}/count")
-async def get_document_count(collection_name: str):
+def get_document_count(collection_name: str, request: Request, weaviate_client=Depends(get_weaviate_client)):
     """
     Get the total number of documents in a specific Weaviate collection.
+    Supports conditional requests via ETag / If-None-Match (304 when unchanged).
     
     Args:
         collection_name (str): Name of the collection to query
@@ -93,8 +172,6 @@ async def get_document_count(collection_name: str):
     Raises:
         HTTPException: If collection doesn't exist or query fails
     """
-    weaviate_client = get_weaviate_client()
-    
     try:
         # Check if Weaviate client is initialized
         if weaviate_client is None:
@@ -103,29 +180,30 @@ async def get_document_count(collection_name: str):
                 detail="Weaviate client not initialized. Check if Weaviate is running."
             )
         
-        # Check if the collection exists in Weaviate schema
-        if not weaviate_client.collections.exists(collection_name):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Collection '{collection_name}' does not exist in Weaviate"
-            )
-        
-        # Get the collection reference
+        # Get the collection reference (no exists() round-trip; a missing collection fails the count)
         collection = weaviate_client.collections.get(collection_name)
         
         # Perform aggregation query to count total objects in collection
-        result = collection.aggregate.over_all(total_count=True)
+        try:
+            result = collection.aggregate.over_all(total_count=True)
+        except Exception as e:
+            if is_collection_not_found(e):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Collection '{collection_name}' does not exist in Weaviate"
+                ) from e
+            raise
         
         # Extract total count from result
         total_count = result.total_count
         
         # Return the count in JSON format
-        return {
+        return _etag_response(request, {
             "collection_name": collection_name,
             "document_count": total_count,
             "status": "success",
             "message": f"Successfully retrieved document count from collection '{collection_name}'"
-        }
+        })
         
     except HTTPException:
         # Re-raise HTTP exceptions (like 404 for collection not found)
@@ -139,7 +217,7 @@ async def get_document_count(collection_name: str):
 
 
 @router.post("")
-async def create_collection(collection_name: str):
+def create_collection(collection_name: str, weaviate_client=Depends(get_weaviate_client)):
     """
     Create a new collection with default ticket schema by just providing a name.
     This is a simplified endpoint that creates a collection with predefined ticket properties.
@@ -151,9 +229,9 @@ async def create_collection(collection_name: str):
         Dict: Success status and collection details
         
     Raises:
-        HTTPException: If collection creation fails or already exists
+        HTTPException: If collection name is invalid, creation fails or already exists
     """
-    weaviate_client = get_weaviate_client()
+    _validate_collection_name(collection_name)
     
     try:
         # Check if Weaviate client is initialized
@@ -170,26 +248,18 @@ async def create_collection(collection_name: str):
                 detail=f"Collection '{collection_name}' already exists"
             )
         
+        # Weaviate schema classes are only needed here, so import them on first use
+        from weaviate.classes.config import Configure
+        
         # Create collection with default ticket schema
         weaviate_client.collections.create(
             name=collection_name,
             description=f"Support ticket collection: {collection_name}",
-            vectorizer_config=wvc.config.Configure.Vectorizer.none(),  # Manual/local embeddings
-            properties=[
-                Property(name="ticket_id", data_type=DataType.TEXT, description="Unique ticket identifier"),
-                Property(name="title", data_type=DataType.TEXT, description="Ticket title/summary"),
-                Property(name="description", data_type=DataType.TEXT, description="Detailed problem description"),
-                Property(name="category", data_type=DataType.TEXT, description="Issue category"),
-                Property(name="status", data_type=DataType.TEXT, description="Ticket status (Open/Resolved)"),
-                Property(name="severity", data_type=DataType.TEXT, description="Severity level"),
-                Property(name="application", data_type=DataType.TEXT, description="Affected application/service"),
-                Property(name="affected_users", data_type=DataType.TEXT, description="Impact scope"),
-                Property(name="environment", data_type=DataType.TEXT, description="Environment (Production/Staging/etc)"),
-                Property(name="solution", data_type=DataType.TEXT, description="Resolution steps"),
-                Property(name="reasoning", data_type=DataType.TEXT, description="Root cause analysis"),
-                Property(name="timestamp", data_type=DataType.TEXT, description="Ticket creation timestamp"),
-            ]
+            vectorizer_config=Configure.Vectorizer.none(),  # Manual/local embeddings
+            vector_index_config=ticket_vector_index_config(),  # SQ-compressed HNSW
+            properties=ticket_properties()
         )
+        weaviate_manager.invalidate_collection_cache(collection_name)
         
         return {
             "success": True,
@@ -199,12 +269,8 @@ async def create_collection(collection_name: str):
                 "description": f"Support ticket collection: {collection_name}",
                 "schema_type": "default_ticket_schema",
                 "vectorizer": "manual/local (sentence-transformers)",
-                "properties_count": 12,
-                "properties": [
-                    "ticket_id", "title", "description", "category", "status", 
-                    "severity", "application", "affected_users", "environment", 
-                    "solution", "reasoning", "timestamp"
-                ]
+                "properties_count": len(TICKET_PROPERTY_NAMES),
+                "properties": TICKET_PROPERTY_NAMES
             }
         }
         
@@ -219,22 +285,59 @@ async def create_collection(collection_name: str):
         )
 
 
+def _invalidate_collection_caches(collection_name: str):
+    """Drop every cached handle/result that refers to a deleted collection."""
+    weaviate_manager.invalidate_collection_cache(collection_name)
+    proximity_cache.invalidate(collection_name)
+    ticket_service.reset_ticket_counter(collection_name)
+    response_cache.clear()
+    ai_service.clear_cache()
+
+
+def _count_and_delete_collection(weaviate_client, collection_name: str):
+    """Background task: report the document count of a collection, then delete it."""
+    try:
+        collection = weaviate_client.collections.get(collection_name)
+        deleted_count = collection.aggregate.over_all(total_count=True).total_count
+    except Exception:
+        deleted_count = 0  # If we can't get count, set to 0
+    
+    try:
+        weaviate_client.collections.delete(collection_name)
+    except Exception:
+        logger.exception("❌ Error deleting collection '%s'", collection_name)
+        return
+    
+    # Drop anything cached while the deletion was pending
+    _invalidate_collection_caches(collection_name)
+    logger.info("🗑️ Collection '%s' deleted (%d documents)", collection_name, deleted_count)
+
+
 @router.delete("/{collection_name}")
-async def delete_collection(collection_name: str):
+def delete_collection(
+    collection_name: str,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    report_count: bool = False,
+    weaviate_client=Depends(get_weaviate_client)
+):
     """
     Delete a collection from Weaviate.
     ⚠️ WARNING: This permanently deletes all data in the collection!
     
     Args:
         collection_name: Name of collection to delete
+        report_count: Count the documents before deleting and log the result.
+            The count and the delete then run together as a background task,
+            so the response (202 Accepted) returns before the deletion completes.
         
     Returns:
-        Dict: Success status and deleted document count
+        Dict: Success status of the deletion (or of scheduling it, with report_count)
         
     Raises:
-        HTTPException: If collection doesn't exist or deletion fails
+        HTTPException: If collection name is invalid, doesn't exist or deletion fails
     """
-    weaviate_client = get_weaviate_client()
+    _validate_collection_name(collection_name)
     
     # Check if Weaviate client is connected
     if weaviate_client is None:
@@ -251,21 +354,24 @@ async def delete_collection(collection_name: str):
                 detail=f"Collection '{collection_name}' does not exist"
             )
         
-        # Get count before deletion (for reporting)
-        try:
-            collection = weaviate_client.collections.get(collection_name)
-            count_result = collection.aggregate.over_all(total_count=True)
-            deleted_count = count_result.total_count
-        except Exception:
-            deleted_count = 0  # If we can't get count, set to 0
+        if report_count:
+            # Count + delete off the request path; the count is only logged
+            _invalidate_collection_caches(collection_name)
+            background_tasks.add_task(_count_and_delete_collection, weaviate_client, collection_name)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return {
+                "success": True,
+                "message": f"Deletion of collection '{collection_name}' scheduled",
+                "note": "The deletion has not completed yet; its outcome and the document count are logged"
+            }
         
         # Delete the collection
         weaviate_client.collections.delete(collection_name)
+        _invalidate_collection_caches(collection_name)
         
         return {
             "success": True,
             "message": f"Collection '{collection_name}' deleted successfully",
-            "deleted_documents": deleted_count,
             "note": "Restart the application to recreate an empty collection"
         }
         
@@ -279,7 +385,7 @@ async def delete_collection(collection_name: str):
 
 
 @router.get("/count")
-async def get_default_collection_count():
+def get_default_collection_count(request: Request, weaviate_client=Depends(get_weaviate_client)):
     """
     Get document count from the default 'SupportTickets' collection.
     This is a convenience endpoint that doesn't require specifying collection name.
@@ -291,4 +397,4 @@ async def get_default_collection_count():
         HTTPException: If default collection doesn't exist or query fails
     """
     # Call the main count endpoint with SupportTickets collection
-    return await get_document_count(settings.TICKETS_COLLECTION_NAME)
+    return get_document_count(settings.TICKETS_COLLECTION_NAME, request, weaviate_client)
@@ -2,15 +2,21 @@
 Health check endpoints.
 Provides API and database health status.
 """
-from fastapi import APIRouter, HTTPException, status # FastAPI router and exceptions
+from time import monotonic # Monotonic clock for cache expiry
+from fastapi import APIRouter, Depends, HTTPException, status # FastAPI router and exceptions
 from fastapi.responses import JSONResponse # JSON response handling
 from app.db import get_weaviate_client
 
 router = APIRouter(tags=["Health Check"])
 
+# Short-lived cache of weaviate_client.is_ready() so frequent load-balancer probes
+# don't each trigger an RPC. Bounded staleness of READY_CACHE_TTL seconds.
+READY_CACHE_TTL = 0.5
+_ready_cache = {"ts": 0.0, "val": False}
+
 
 @router.get("/health")
-async def health_check():
+def health_check(weaviate_client=Depends(get_weaviate_client)):
     """
     Health check endpoint to verify Weaviate connection status.
     
@@ -20,8 +26,6 @@ async def health_check():
     Raises:
         HTTPException: If Weaviate connection fails
     """
-    weaviate_client = get_weaviate_client()
-    
     try:
         # Check if Weaviate client exists
         if weaviate_client is None:
@@ -35,8 +39,14 @@ async def health_check():
                 }
             )
         
-        # Check if Weaviate is ready
-        is_ready = weaviate_client.is_ready()
+        # Check if Weaviate is ready (reuse a recent result if still fresh)
+        now = monotonic()
+        if now - _ready_cache["ts"] < READY_CACHE_TTL:
+            is_ready = _ready_cache["val"]
+        else:
+            is_ready = weaviate_client.is_ready()
+            _ready_cache["ts"] = now
+            _ready_cache["val"] = is_ready
         
         if is_ready:
             return {
@@ -56,6 +66,9 @@ async def health_check():
                 }
             )
     except Exception as e:
+        # Invalidate the cache so recovery is detected on the next probe
+        _ready_cache["ts"] = 0.0
+        
         # Return error if connection fails
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
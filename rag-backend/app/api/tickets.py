@@ -2,20 +2,166 @@
 Ticket management endpoints.
 Handles ticket CRUD operations and AI-powered ticket resolution.
 """
+import asyncio
+import logging
+import queue
+import threading
+import time
+import orjson # Fast JSON encoding for SSE payloads
 from fastapi import APIRouter, HTTPException, status 
-from typing import Optional, List
+from fastapi.responses import StreamingResponse # Server-Sent Events and streamed JSON bodies
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
 import weaviate.classes as wvc
-from app.db import get_weaviate_client
+from app.db import distance_to_similarity, get_weaviate_client, is_collection_not_found, weaviate_manager
 from app.models import (
     TicketModel,
     TicketSubmissionModel,
     TicketResponse,
     AITicketResponse,
+    SimilarTickets,
 )
-from app.services import embedding_service, ai_service, ticket_service
+from app.services.embedding_service import embedding_service
+from app.services.embedding_batcher import embedding_batcher
+from app.services.ai_service import ai_service
+from app.services.ticket_service import ticket_service
+from app.services.proximity_cache import proximity_cache
+from app.services.response_cache import response_cache
 from app.core.config import settings
 
 router = APIRouter(prefix="/api/v1/tickets", tags=["Tickets"])
+logger = logging.getLogger(__name__)
+
+# The Weaviate client is synchronous. Endpoints that only talk to Weaviate are plain
+# `def` (FastAPI runs them in its threadpool); async endpoints that also await
+# embeddings push their Weaviate calls onto threads (asyncio.to_thread or the ticket service pool).
+# That includes batch uploads: the whole dynamic batch (add_object + flush) runs in a worker thread.
+
+# Tickets embedded per model call in batch uploads
+EMBED_CHUNK_SIZE = 32
+
+# Most queries accepted by one batched similar-ticket lookup (one encoder pass)
+MAX_BATCH_QUERIES = 32
+
+# Properties returned by search results unless the caller asks for more (?fields=)
+SUMMARY_PROPERTIES = ["ticket_id", "title", "category", "severity", "application", "status", "timestamp"]
+_TICKET_PROPERTIES = frozenset(TicketModel.model_fields)
+
+# Search responses with more results than this are streamed (one result encoded at a time)
+_STREAM_THRESHOLD = 100
+
+# Per-collection total ticket count for pagination: {collection: (timestamp, count)}.
+# An exact total is rarely needed on every page turn, so reuse it for a short while.
+COUNT_CACHE_TTL = 30  # seconds
+_count_cache: Dict[str, Tuple[float, int]] = {}
+
+# One batch upload at a time per collection: the dynamic batch wrapper (and its
+# failed_objects) is shared by every user of the cached collection handle
+_batch_locks: Dict[str, threading.Lock] = {}
+
+
+def _get_total_count(tickets_collection, collection_name: str) -> int:
+    """Get the collection's total ticket count, aggregating at most once per TTL."""
+    cached = _count_cache.get(collection_name)
+    if cached is not None and time.monotonic() - cached[0] < COUNT_CACHE_TTL:
+        return cached[1]
+    
+    total_count = tickets_collection.aggregate.over_all(total_count=True).total_count
+    _count_cache[collection_name] = (time.monotonic(), total_count)
+    return total_count
+
+
+def _build_ticket(obj) -> Dict:
+    """Turn a Weaviate object into a ticket dict (its properties plus the uuid)."""
+    ticket_data = obj.properties
+    ticket_data["uuid"] = str(obj.uuid)
+    return ticket_data
+
+
+def _build_search_result(obj) -> Dict:
+    """Turn a near_vector hit into a search result dict with distance and similarity."""
+    result_data = _build_ticket(obj)
+    result_data["distance"] = obj.metadata.distance
+    # 0-1 score derived from the distance (certainty is only returned for cosine)
+    similarity = distance_to_similarity(obj.metadata.distance)
+    result_data["certainty"] = similarity
+    result_data["similarity_score"] = similarity
+    return result_data
+
+
+def _stream_json_object(head: Dict, key: str, items: Iterable[Dict]) -> Iterator[bytes]:
+    """Yield a JSON object whose `key` array is encoded item by item (`[`, `,`, `]` framing)."""
+    yield orjson.dumps(head)[:-1] + b',"%s":[' % key.encode()
+    for i, item in enumerate(items):
+        encoded = orjson.dumps(item)
+        yield encoded if i == 0 else b"," + encoded
+    yield b"]}"
+
+
+def _resolve_return_properties(fields: Optional[str], default: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Turn the `fields` query parameter into a Weaviate return_properties list.
+    
+    Args:
+        fields: None for the endpoint default, "all", "summary",
+            or a comma-separated list of property names
+        default: Projection used when fields is None (None = all properties)
+        
+    Returns:
+        Property names to fetch, or None to fetch every property
+        
+    Raises:
+        HTTPException: If fields names an unknown property
+    """
+    if fields is None:
+        return default
+    if fields == "all":
+        return None
+    if fields == "summary":
+        return SUMMARY_PROPERTIES
+    
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in _TICKET_PROPERTIES]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown) or fields}. Use 'all', 'summary' or ticket property names."
+        )
+    return requested
+
+
+def _collection_not_found(collection_name: str) -> HTTPException:
+    """404 for a collection Weaviate reported as missing."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Collection '{collection_name}' does not exist"
+    )
+
+
+def _invalidate_ticket_caches(collection_name: str):
+    """Drop cached counts, similarity results and answers after a collection's tickets change."""
+    _count_cache.pop(collection_name, None)
+    ticket_service.reset_ticket_counter(collection_name)
+    proximity_cache.invalidate(collection_name)
+    response_cache.clear()
+    ai_service.clear_cache()
+
+
+def _ticket_properties(ticket: TicketModel) -> Dict:
+    """Weaviate properties stored for a ticket."""
+    return {
+        "ticket_id": ticket.ticket_id,
+        "title": ticket.title,
+        "description": ticket.description,
+        "category": ticket.category,
+        "status": ticket.status,
+        "severity": ticket.severity,
+        "application": ticket.application,
+        "affected_users": ticket.affected_users,
+        "environment": ticket.environment,
+        "solution": ticket.solution,
+        "reasoning": ticket.reasoning,
+        "timestamp": ticket.timestamp
+    }
 
 
 @router.post("", response_model=TicketResponse)
@@ -46,42 +192,31 @@ async def upload_ticket(ticket: TicketModel, collection_name: Optional[str] = No
     target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
     
     try:
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
+        # Look up the target collection (handle cached after the first lookup) while the
+        # ticket content (title + description + solution) is embedded - the two are independent
+        tickets_collection, embedding = await asyncio.gather(
+            asyncio.to_thread(weaviate_manager.get_or_check_collection, target_collection),
+            embedding_service.aencode(ticket.embed_text)
+        )
+        if tickets_collection is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Collection '{target_collection}' does not exist"
             )
         
-        # Get the target collection
-        tickets_collection = weaviate_client.collections.get(target_collection)
-        
         # Prepare ticket data for Weaviate
-        ticket_data = {
-            "ticket_id": ticket.ticket_id,
-            "title": ticket.title,
-            "description": ticket.description,
-            "category": ticket.category,
-            "status": ticket.status,
-            "severity": ticket.severity,
-            "application": ticket.application,
-            "affected_users": ticket.affected_users,
-            "environment": ticket.environment,
-            "solution": ticket.solution,
-            "reasoning": ticket.reasoning,
-            "timestamp": ticket.timestamp
-        }
-        
-        # Generate embedding from ticket content (title + description + solution)
-        text_to_embed = f"{ticket.title} {ticket.description} {ticket.solution}"
-        embedding = embedding_service.generate_embedding(text_to_embed)
+        ticket_data = _ticket_properties(ticket)
         
-        # Insert ticket into Weaviate with local embedding
-        uuid = tickets_collection.data.insert(
+        # Insert ticket into Weaviate with local embedding (blocking client call runs in a thread)
+        uuid = await asyncio.to_thread(
+            tickets_collection.data.insert,
             properties=ticket_data,
             vector=embedding  # Provide embedding manually
         )
         
+        # Collection contents changed - cached counts, similarity results and answers are stale
+        _invalidate_ticket_caches(target_collection)
+        
         return TicketResponse(
             success=True,
             message=f"Ticket {ticket.ticket_id} uploaded successfully to collection '{target_collection}' with embedding",
@@ -96,6 +231,56 @@ async def upload_ticket(ticket: TicketModel, collection_name: Optional[str] = No
         )
 
 
+def _write_ticket_batch(tickets_collection, collection_name: str, chunks: "queue.Queue") -> Tuple[int, List[Dict]]:
+    """
+    Worker thread for batch uploads: add embedded chunks from `chunks` to a Weaviate
+    dynamic batch until a None sentinel arrives, then collect server-side failures.
+    The batch wrapper lives on the (shared, cached) collection handle, so uploads to
+    the same collection are serialized.
+    
+    Returns:
+        Tuple of (uploaded count, failed tickets)
+    """
+    uploaded_count = 0
+    failed_tickets = []
+    
+    with _batch_locks.setdefault(collection_name, threading.Lock()):
+        try:
+            with tickets_collection.batch.dynamic() as batch:
+                while (item := chunks.get()) is not None:
+                    chunk, embeddings = item
+                    
+                    # Embedding failed for this chunk - record each ticket and keep going
+                    if isinstance(embeddings, Exception):
+                        failed_tickets.extend(
+                            {"ticket_id": ticket.ticket_id, "error": str(embeddings)} for ticket in chunk
+                        )
+                        continue
+                    
+                    for ticket, embedding in zip(chunk, embeddings):
+                        try:
+                            # Add to batch with embedding (Weaviate accepts NumPy arrays)
+                            batch.add_object(properties=_ticket_properties(ticket), vector=embedding)
+                            uploaded_count += 1
+                        except Exception as e:
+                            failed_tickets.append({"ticket_id": ticket.ticket_id, "error": str(e)})
+        except BaseException:
+            # Keep draining so the producer never blocks on a full queue
+            while chunks.get() is not None:
+                pass
+            raise
+        
+        # Objects the server rejected only show up once the batch has flushed
+        for failed in tickets_collection.batch.failed_objects:
+            uploaded_count -= 1
+            failed_tickets.append({
+                "ticket_id": (failed.object_.properties or {}).get("ticket_id", "N/A"),
+                "error": failed.message
+            })
+    
+    return uploaded_count, failed_tickets
+
+
 @router.post("/batch")
 async def upload_tickets_batch(tickets: List[TicketModel], collection_name: Optional[str] = None):
     """
@@ -124,55 +309,41 @@ async def upload_tickets_batch(tickets: List[TicketModel], collection_name: Opti
     target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
     
     try:
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
+        # Get the target collection (handle cached after the first lookup)
+        tickets_collection = await asyncio.to_thread(weaviate_manager.get_or_check_collection, target_collection)
+        if tickets_collection is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Collection '{target_collection}' does not exist"
             )
         
-        # Get the target collection
-        tickets_collection = weaviate_client.collections.get(target_collection)
-        
-        # Prepare batch data
-        uploaded_count = 0
-        failed_tickets = []
-        
-        # Use Weaviate batch insert for efficiency
-        with tickets_collection.batch.dynamic() as batch:
-            for ticket in tickets:
-                try:
-                    ticket_data = {
-                        "ticket_id": ticket.ticket_id,
-                        "title": ticket.title,
-                        "description": ticket.description,
-                        "category": ticket.category,
-                        "status": ticket.status,
-                        "severity": ticket.severity,
-                        "application": ticket.application,
-                        "affected_users": ticket.affected_users,
-                        "environment": ticket.environment,
-                        "solution": ticket.solution,
-                        "reasoning": ticket.reasoning,
-                        "timestamp": ticket.timestamp
-                    }
-                    
-                    # Generate embedding from ticket content
-                    text_to_embed = f"{ticket.title} {ticket.description} {ticket.solution}"
-                    embedding = embedding_service.generate_embedding(text_to_embed)
-                    
-                    # Add to batch with embedding
-                    batch.add_object(
-                        properties=ticket_data,
-                        vector=embedding
-                    )
-                    uploaded_count += 1
-                    
-                except Exception as e:
-                    failed_tickets.append({
-                        "ticket_id": ticket.ticket_id,
-                        "error": str(e)
-                    })
+        # Pipeline: embed chunk N+1 in the embedding pool while a worker thread adds
+        # chunk N to the Weaviate batch (which flushes in its own background threads)
+        chunks: "queue.Queue[Optional[Tuple[List[TicketModel], object]]]" = queue.Queue(maxsize=2)
+        
+        async def produce_embeddings():
+            try:
+                for start in range(0, len(tickets), EMBED_CHUNK_SIZE):
+                    chunk = tickets[start:start + EMBED_CHUNK_SIZE]
+                    # Embed title + description + solution, same text as single upload
+                    texts_to_embed = [ticket.embed_text for ticket in chunk]
+                    try:
+                        embeddings = await embedding_service.aencode_many(texts_to_embed, EMBED_CHUNK_SIZE)
+                    except Exception as e:
+                        embeddings = e
+                    await asyncio.to_thread(chunks.put, (chunk, embeddings))
+            finally:
+                # Always terminate the writer, even if embedding is cancelled
+                await asyncio.to_thread(chunks.put, None)
+        
+        # The blocking batch (add_object calls and the exit flush) runs on a worker thread
+        uploaded_count, failed_tickets = (await asyncio.gather(
+            produce_embeddings(),
+            asyncio.to_thread(_write_ticket_batch, tickets_collection, target_collection, chunks)
+        ))[1]
+        
+        # Collection contents changed - cached counts, similarity results and answers are stale
+        _invalidate_ticket_caches(target_collection)
         
         return {
             "success": True,
@@ -191,6 +362,67 @@ async def upload_tickets_batch(tickets: List[TicketModel], collection_name: Opti
         )
 
 
+def _response_cache_key(ticket: TicketSubmissionModel, collection_name: str) -> str:
+    """Response-cache key for a submission against a collection."""
+    fields = ticket.model_dump(exclude={"collection_name"})
+    fields["collection"] = collection_name
+    return response_cache.make_key(fields)
+
+
+async def _retrieve_similar_tickets(
+    weaviate_client,
+    collection_name: str,
+    query_text: str,
+    timings: Optional[Dict[str, float]] = None
+) -> SimilarTickets:
+    """
+    Embed the query and find similar tickets above the similarity threshold.
+    Near-duplicate queries reuse a cached result instead of querying Weaviate.
+    Stage durations (ms) are recorded in `timings` when given.
+    """
+    started = time.perf_counter()
+    query_embedding = await embedding_batcher.embed(query_text)
+    embedded = time.perf_counter()
+    
+    similar_tickets = proximity_cache.lookup(collection_name, query_embedding)
+    if similar_tickets is None:
+        similar_tickets = await ticket_service.afind_similar_tickets(
+            weaviate_client=weaviate_client,
+            collection_name=collection_name,
+            query_text=query_text,
+            k=settings.DEFAULT_SEARCH_LIMIT,
+            similarity_threshold=settings.SIMILARITY_THRESHOLD,
+            precomputed_vector=query_embedding
+        )
+        # Empty results are not cached: they may stem from a transient search error
+        if similar_tickets:
+            proximity_cache.insert(collection_name, query_embedding, similar_tickets)
+    
+    if timings is not None:
+        timings["embed_ms"] = (embedded - started) * 1000
+        timings["retrieve_ms"] = (time.perf_counter() - embedded) * 1000
+    return similar_tickets
+
+
+def _cache_response(cache_key: str, response: AITicketResponse):
+    """Cache an AI response without its per-request preview ticket ID (a fresh one is issued on replay)."""
+    response_cache.set(cache_key, response.model_copy(update={"ticket_id": ""}))
+
+
+def _resolution_status(reasoning: str, solution: str, similar_count: int) -> Tuple[str, str]:
+    """Ticket status and user message for a generated answer."""
+    if reasoning.startswith("Unable to generate") or solution.startswith("Unable to generate"):
+        return "Open", "AI generation failed. Manual review recommended."
+    if similar_count == 0:
+        return "Open", "No similar incidents found (85% threshold). Expert validation recommended."
+    return "Resolved", f"AI-generated solution based on {similar_count} similar incident(s)."
+
+
+def _sse(event: str, data) -> bytes:
+    """Encode one Server-Sent Event."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
 @router.post("/submit-user-input", response_model=AITicketResponse)
 async def RAG_Response(ticket: TicketSubmissionModel):
     """
@@ -223,63 +455,52 @@ async def RAG_Response(ticket: TicketSubmissionModel):
         # Use default collection name if not provided
         target_collection = ticket.collection_name or settings.TICKETS_COLLECTION_NAME
         
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Collection '{target_collection}' does not exist. Create it first."
-            )
-        
-        # Step 1: Search for similar tickets in vector DB
-        query_text = f"{ticket.title} {ticket.description} {ticket.application}"
-        similar_tickets = ticket_service.find_similar_tickets(
+        # Temporary ticket ID (not saved to DB) only depends on the collection count,
+        # so fetch it concurrently with retrieval and generation
+        ticket_id_task = asyncio.create_task(ticket_service.apeek_ticket_id(
             weaviate_client=weaviate_client,
             collection_name=target_collection,
-            query_text=query_text,
-            k=settings.DEFAULT_SEARCH_LIMIT,
-            similarity_threshold=settings.SIMILARITY_THRESHOLD
+            prefix="TKT-PREVIEW"
+        ))
+        
+        # Identical submissions reuse the previous answer (skips search + LLM)
+        cache_key = _response_cache_key(ticket, target_collection)
+        cached_response = response_cache.get(cache_key)
+        if cached_response is not None:
+            return cached_response.model_copy(update={"ticket_id": await ticket_id_task})
+        
+        # Step 1: Search for similar tickets in vector DB (per-stage timings are logged)
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        similar_tickets = await _retrieve_similar_tickets(
+            weaviate_client, target_collection, ticket.query_text, timings
         )
         
         # Step 2: Prepare ticket data for AI
-        ticket_data = {
-            "title": ticket.title,
-            "description": ticket.description,
-            "category": ticket.category,
-            "severity": ticket.severity,
-            "application": ticket.application,
-            "affected_users": ticket.affected_users,
-            "environment": ticket.environment
-        }
+        ticket_data = ticket.model_dump(exclude={"collection_name"})
         
-        # Step 3: Generate AI solution using Groq's open-source LLM
-        reasoning, solution = ai_service.generate_solution(ticket_data, similar_tickets)
+        # Step 3: Generate AI solution using Groq's open-source LLM (async, doesn't block the loop)
+        llm_started = time.perf_counter()
+        reasoning, solution = await ai_service.agenerate_solution(ticket_data, similar_tickets)
+        timings["llm_ms"] = (time.perf_counter() - llm_started) * 1000
         
         # Step 4: Determine ticket status
-        has_error = reasoning.startswith("Unable to generate") or solution.startswith("Unable to generate")
-        has_similar_tickets = len(similar_tickets) > 0
-        
-        if has_error:
-            status_value = "Open"
-            message = "AI generation failed. Manual review recommended."
-        elif not has_similar_tickets:
-            status_value = "Open"
-            message = "No similar incidents found (85% threshold). Expert validation recommended."
-        else:
-            status_value = "Resolved"
-            message = f"AI-generated solution based on {len(similar_tickets)} similar incident(s)."
-        
-        # Step 5: Generate temporary ticket ID (not saved to DB)
-        ticket_id = ticket_service.generate_ticket_id(
-            weaviate_client=weaviate_client,
-            collection_name=target_collection,
-            prefix="TKT-PREVIEW"
+        status_value, message = _resolution_status(reasoning, solution, len(similar_tickets))
+        
+        # Step 5: Collect the temporary ticket ID
+        ticket_id = await ticket_id_task
+        
+        logger.info(
+            "RAG_Response collection=%s similar=%d embed=%.1fms retrieve=%.1fms llm=%.1fms total=%.1fms",
+            target_collection, len(similar_tickets), timings["embed_ms"], timings["retrieve_ms"],
+            timings["llm_ms"], (time.perf_counter() - started) * 1000
         )
         
         # Step 6: Format similar tickets for response
         similar_tickets_response = ticket_service.format_similar_tickets_for_response(similar_tickets)
         
-        # Return response (ticket NOT saved to database)
-        return AITicketResponse(
+        # Build response (ticket NOT saved to database)
+        response = AITicketResponse(
             success=True,
             ticket_id=ticket_id,
             status=status_value,
@@ -289,17 +510,151 @@ async def RAG_Response(ticket: TicketSubmissionModel):
             message=f"{message} Note: Ticket not saved to database."
         )
         
+        # Only cache grounded, successful answers
+        if status_value == "Resolved":
+            _cache_response(cache_key, response)
+        
+        return response
+        
     except HTTPException:
         raise
     except Exception as e:
+        # No existence probe up front - a missing collection fails the similarity search
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing ticket submission: {str(e)}"
         )
 
 
+@router.post("/submit-user-input/stream")
+async def RAG_Response_stream(ticket: TicketSubmissionModel):
+    """
+    Streaming variant of /submit-user-input using Server-Sent Events.
+    The LLM answer is streamed token by token instead of after full generation.
+    
+    Events (in order):
+    - similar_tickets: similar incidents found, sent before generation starts
+    - token: {"text": ...} chunk of LLM output, as it is generated
+    - result: the complete AITicketResponse (same body as /submit-user-input)
+    
+    Args:
+        ticket: TicketSubmissionModel with incident details
+        
+    Returns:
+        StreamingResponse: text/event-stream of the events above
+        
+    Raises:
+        HTTPException: If Weaviate is not connected or retrieval fails
+    """
+    weaviate_client = get_weaviate_client()
+    
+    # Check if Weaviate client is connected
+    if weaviate_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Weaviate vector database is not connected. Please check connection."
+        )
+    
+    # Use default collection name if not provided
+    target_collection = ticket.collection_name or settings.TICKETS_COLLECTION_NAME
+    cache_key = _response_cache_key(ticket, target_collection)
+    cached_response = response_cache.get(cache_key)
+    
+    try:
+        # Temporary ticket ID, fetched concurrently with retrieval and generation
+        ticket_id_task = asyncio.create_task(ticket_service.apeek_ticket_id(
+            weaviate_client=weaviate_client,
+            collection_name=target_collection,
+            prefix="TKT-PREVIEW"
+        ))
+        
+        similar_tickets = SimilarTickets()
+        if cached_response is None:
+            # Retrieval happens before streaming starts, so errors still map to HTTP status codes
+            similar_tickets = await _retrieve_similar_tickets(weaviate_client, target_collection, ticket.query_text)
+    except Exception as e:
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing ticket submission: {str(e)}"
+        )
+    
+    async def event_stream():
+        # Identical submissions replay the cached answer
+        if cached_response is not None:
+            yield _sse("similar_tickets", cached_response.similar_tickets)
+            yield _sse("result", cached_response.model_copy(update={"ticket_id": await ticket_id_task}).model_dump())
+            return
+        
+        similar_tickets_response = ticket_service.format_similar_tickets_for_response(similar_tickets)
+        yield _sse("similar_tickets", similar_tickets_response)
+        
+        ticket_data = ticket.model_dump(exclude={"collection_name"})
+        async for event in ai_service.astream_solution(ticket_data, similar_tickets):
+            if "token" in event:
+                yield _sse("token", {"text": event["token"]})
+                continue
+            
+            # Final event: parsed reasoning and solution
+            status_value, message = _resolution_status(event["reasoning"], event["solution"], len(similar_tickets))
+            response = AITicketResponse(
+                success=True,
+                ticket_id=await ticket_id_task,
+                status=status_value,
+                reasoning=event["reasoning"],
+                solution=event["solution"],
+                similar_tickets=similar_tickets_response,
+                message=f"{message} Note: Ticket not saved to database."
+            )
+            if status_value == "Resolved":
+                _cache_response(cache_key, response)
+            yield _sse("result", response.model_dump())
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # Don't let proxies buffer the stream
+    )
+
+
+@router.get("/_cache")
+def get_cache_stats():
+    """
+    Report AI cache sizes and hit/miss counters (observability endpoint).
+    
+    Returns:
+        Dict: Response cache size and LLM answer cache statistics
+    """
+    return {
+        "success": True,
+        "response_cache_enabled": response_cache.enabled,
+        "response_cache_entries": len(response_cache),
+        "llm_cache": ai_service.cache_stats()
+    }
+
+
+@router.delete("/_cache")
+async def clear_response_cache():
+    """
+    Clear the cached AI ticket responses (admin/invalidation endpoint).
+    
+    Returns:
+        Dict: Success status and number of cleared entries
+    """
+    cleared = response_cache.clear()
+    ai_service.clear_cache()
+    return {
+        "success": True,
+        "message": "AI response cache cleared",
+        "cleared_entries": cleared
+    }
+
+
 @router.get("")
-async def get_all_tickets(limit: int = 100, offset: int = 0, collection_name: Optional[str] = None):
+def get_all_tickets(limit: int = 100, offset: int = 0, collection_name: Optional[str] = None, fields: Optional[str] = None):
     """
     Retrieve all tickets from Weaviate collection.
     
@@ -307,6 +662,7 @@ async def get_all_tickets(limit: int = 100, offset: int = 0, collection_name: Op
         limit: Maximum number of tickets to return (default 100)
         offset: Number of tickets to skip (default 0)
         collection_name: Name of the collection to query (default: SupportTickets)
+        fields: Properties to return - "all" (default), "summary" or comma-separated names
         
     Returns:
         Dict: List of tickets and metadata
@@ -326,33 +682,25 @@ async def get_all_tickets(limit: int = 100, offset: int = 0, collection_name: Op
     # Use default collection name if not provided
     target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
     
+    # Properties to fetch (validated before any Weaviate call)
+    return_properties = _resolve_return_properties(fields, default=None)
+    
     try:
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Collection '{target_collection}' does not exist"
-            )
-        
-        # Get the target collection
-        tickets_collection = weaviate_client.collections.get(target_collection)
+        # Get the target collection handle (no existence probe - a missing collection fails the query)
+        tickets_collection = weaviate_manager.get_collection(target_collection)
         
         # Query all tickets with limit and offset
         response = tickets_collection.query.fetch_objects(
             limit=limit,
-            offset=offset
+            offset=offset,
+            return_properties=return_properties
         )
         
-        # Get total count
-        total_result = tickets_collection.aggregate.over_all(total_count=True)
-        total_count = total_result.total_count
+        # Get total count (cached for COUNT_CACHE_TTL seconds)
+        total_count = _get_total_count(tickets_collection, target_collection)
         
         # Extract ticket data
-        tickets_list = []
-        for obj in response.objects:
-            ticket_data = obj.properties
-            ticket_data["uuid"] = str(obj.uuid)
-            tickets_list.append(ticket_data)
+        tickets_list = [_build_ticket(obj) for obj in response.objects]
         
         return {
             "success": True,
@@ -365,6 +713,8 @@ async def get_all_tickets(limit: int = 100, offset: int = 0, collection_name: Op
         }
         
     except Exception as e:
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving tickets: {str(e)}"
@@ -372,7 +722,7 @@ async def get_all_tickets(limit: int = 100, offset: int = 0, collection_name: Op
 
 
 @router.get("/search")
-async def search_tickets(query: str, limit: int = 3, collection_name: Optional[str] = None):
+async def search_tickets(query: str, limit: int = 3, collection_name: Optional[str] = None, fields: Optional[str] = None):
     """
     Search for similar tickets using vector similarity search with local embeddings.
     
@@ -380,6 +730,7 @@ async def search_tickets(query: str, limit: int = 3, collection_name: Optional[s
         query: Search query (natural language description)
         limit: Maximum number of results (default 3)
         collection_name: Name of the collection to search in (default: SupportTickets)
+        fields: Properties to return - "summary" (default), "all" or comma-separated names
         
     Returns:
         Dict: List of similar tickets with similarity scores
@@ -399,36 +750,40 @@ async def search_tickets(query: str, limit: int = 3, collection_name: Optional[s
     # Use default collection name if not provided
     target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
     
+    # Properties to fetch (validated before any Weaviate call)
+    return_properties = _resolve_return_properties(fields, default=SUMMARY_PROPERTIES)
+    
     try:
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Collection '{target_collection}' does not exist"
-            )
+        # Get the target collection handle (no existence probe - a missing collection fails the query)
+        tickets_collection = weaviate_manager.get_collection(target_collection)
         
-        # Get the target collection
-        tickets_collection = weaviate_client.collections.get(target_collection)
+        # Generate embedding from search query using local model (batched with concurrent requests)
+        query_embedding = await embedding_batcher.embed(query)
         
-        # Generate embedding from search query using local model
-        query_embedding = embedding_service.generate_embedding(query)
-        
-        # Perform vector similarity search using generated embedding
-        response = tickets_collection.query.near_vector(
+        # Perform vector similarity search using generated embedding (in a thread, off the event loop)
+        response = await asyncio.to_thread(
+            tickets_collection.query.near_vector,
             near_vector=query_embedding,
             limit=limit,
-            return_metadata=wvc.query.MetadataQuery(distance=True, certainty=True)
+            return_properties=return_properties,  # Summary fields only, unless asked for more
+            return_metadata=wvc.query.MetadataQuery(distance=True)
         )
         
+        # Large result sets are encoded as they are sent instead of materialized first
+        if len(response.objects) > _STREAM_THRESHOLD:
+            head = {
+                "success": True,
+                "collection": target_collection,
+                "query": query,
+                "results_count": len(response.objects)
+            }
+            return StreamingResponse(
+                _stream_json_object(head, "results", map(_build_search_result, response.objects)),
+                media_type="application/json"
+            )
+        
         # Extract results
-        results = []
-        for obj in response.objects:
-            result_data = obj.properties
-            result_data["uuid"] = str(obj.uuid)
-            result_data["distance"] = obj.metadata.distance
-            result_data["certainty"] = obj.metadata.certainty
-            result_data["similarity_score"] = obj.metadata.certainty  # 0-1 score
-            results.append(result_data)
+        results = [_build_search_result(obj) for obj in response.objects]
         
         return {
             "success": True,
@@ -439,20 +794,87 @@ async def search_tickets(query: str, limit: int = 3, collection_name: Optional[s
         }
         
     except Exception as e:
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error searching tickets: {str(e)}"
         )
 
 
+@router.post("/similar/batch")
+async def find_similar_tickets_batch(queries: List[str], collection_name: Optional[str] = None):
+    """
+    Find similar past tickets for several queries at once.
+    All queries are embedded in one model call and the vector searches run
+    concurrently, so N queries cost far less than N calls to /search.
+    
+    Args:
+        queries: Query texts (at most MAX_BATCH_QUERIES)
+        collection_name: Name of the collection to search in (default: SupportTickets)
+        
+    Returns:
+        Dict: Similar tickets (above the similarity threshold) for each query, in input order
+        
+    Raises:
+        HTTPException: If Weaviate is not connected, the batch is too large or the search fails
+    """
+    weaviate_client = get_weaviate_client()
+    
+    # Check if Weaviate client is connected
+    if weaviate_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Weaviate vector database is not connected. Please check connection."
+        )
+    
+    if len(queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_QUERIES} queries per batch (got {len(queries)})"
+        )
+    
+    # Use default collection name if not provided
+    target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
+    
+    try:
+        results = await ticket_service.afind_similar_tickets_batch(
+            weaviate_client=weaviate_client,
+            collection_name=target_collection,
+            query_texts=queries,
+            k=settings.DEFAULT_SEARCH_LIMIT,
+            similarity_threshold=settings.SIMILARITY_THRESHOLD
+        )
+    except Exception as e:
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding similar tickets: {str(e)}"
+        )
+    
+    return {
+        "success": True,
+        "collection": target_collection,
+        "results": [
+            {
+                "query": query,
+                "similar_tickets": ticket_service.format_similar_tickets_for_response(similar_tickets)
+            }
+            for query, similar_tickets in zip(queries, results)
+        ]
+    }
+
+
 @router.get("/{ticket_id}")
-async def get_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None):
+def get_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None, fields: Optional[str] = None):
     """
     Retrieve a specific ticket by its ticket_id.
     
     Args:
         ticket_id: Unique ticket identifier (e.g., TKT-0001)
         collection_name: Name of the collection to search in (default: SupportTickets)
+        fields: Properties to return - "all" (default), "summary" or comma-separated names
         
     Returns:
         Dict: Ticket data
@@ -472,21 +894,18 @@ async def get_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None
     # Use default collection name if not provided
     target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
     
+    # Properties to fetch (validated before any Weaviate call)
+    return_properties = _resolve_return_properties(fields, default=None)
+    
     try:
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Collection '{target_collection}' does not exist"
-            )
-        
-        # Get the target collection
-        tickets_collection = weaviate_client.collections.get(target_collection)
+        # Get the target collection handle (no existence probe - a missing collection fails the query)
+        tickets_collection = weaviate_manager.get_collection(target_collection)
         
         # Query for specific ticket_id
         response = tickets_collection.query.fetch_objects(
             filters=wvc.query.Filter.by_property("ticket_id").equal(ticket_id),
-            limit=1
+            limit=1,
+            return_properties=return_properties
         )
         
         if len(response.objects) == 0:
@@ -509,6 +928,8 @@ async def get_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None
     except HTTPException:
         raise
     except Exception as e:
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving ticket: {str(e)}"
@@ -516,7 +937,7 @@ async def get_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None
 
 
 @router.delete("/{ticket_id}")
-async def delete_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None):
+def delete_ticket_by_id(ticket_id: str, collection_name: Optional[str] = None):
     """
     Delete a specific ticket from Weaviate by its ticket_id.
     
@@ -543,20 +964,16 @@ async def delete_ticket_by_id(ticket_id: str, collection_name: Optional[str] = N
     target_collection = collection_name or settings.TICKETS_COLLECTION_NAME
     
     try:
-        # Check if collection exists
-        if not weaviate_client.collections.exists(target_collection):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Collection '{target_collection}' does not exist"
-            )
+        # Get the target collection handle (no existence probe - a missing collection fails the query)
+        tickets_collection = weaviate_manager.get_collection(target_collection)
         
-        # Get the target collection
-        tickets_collection = weaviate_client.collections.get(target_collection)
+        ticket_filter = wvc.query.Filter.by_property("ticket_id").equal(ticket_id)
         
-        # First, find the ticket to get its UUID
+        # Find the ticket first (title only) - the response reports what was deleted
         response = tickets_collection.query.fetch_objects(
-            filters=wvc.query.Filter.by_property("ticket_id").equal(ticket_id),
-            limit=1
+            filters=ticket_filter,
+            limit=1,
+            return_properties=["title"]
         )
         
         # Check if ticket exists
@@ -566,12 +983,11 @@ async def delete_ticket_by_id(ticket_id: str, collection_name: Optional[str] = N
                 detail=f"Ticket '{ticket_id}' not found in collection '{target_collection}'"
             )
         
-        # Get the UUID of the ticket to delete
-        ticket_uuid = response.objects[0].uuid
-        ticket_data = response.objects[0].properties
+        # Delete server-side by filter (also removes any duplicates of the same ticket_id)
+        result = tickets_collection.data.delete_many(where=ticket_filter)
         
-        # Delete the ticket by UUID
-        tickets_collection.data.delete_by_id(ticket_uuid)
+        # Collection contents changed - cached counts, similarity results and answers are stale
+        _invalidate_ticket_caches(target_collection)
         
         return {
             "success": True,
@@ -579,14 +995,17 @@ async def delete_ticket_by_id(ticket_id: str, collection_name: Optional[str] = N
             "collection": target_collection,
             "deleted_ticket": {
                 "ticket_id": ticket_id,
-                "uuid": str(ticket_uuid),
-                "title": ticket_data.get("title", "N/A")
+                "uuid": str(response.objects[0].uuid),
+                "title": response.objects[0].properties.get("title", "N/A"),
+                "deleted_count": result.successful
             }
         }
         
     except HTTPException:
         raise
     except Exception as e:
+        if is_collection_not_found(e):
+            raise _collection_not_found(target_collection) from e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting ticket: {str(e)}"
@@ -18,6 +18,12 @@ class Settings:
     API_DESCRIPTION: str = "REST API for Weaviate Vector Database Operations"
     API_VERSION: str = "1.0.0"
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    ENV: str = os.getenv("ENVIRONMENT", "development").lower()  # "production" runs run.py without reload
+    # Worker processes in production. Keep at 1: caches, ticket ID counters and collection
+    # handles are per process and invalidated only in the worker that served the write,
+    # and every worker loads its own embedding model.
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
     
     # Weaviate Configuration
     WEAVIATE_HOST: str = os.getenv("WEAVIATE_HOST", "localhost")
@@ -26,18 +32,48 @@ class Settings:
     
     # Collection Configuration
     TICKETS_COLLECTION_NAME: str = "SupportTickets"
+    VECTOR_INDEX_SQ: bool = os.getenv("VECTOR_INDEX_SQ", "true").lower() == "true"  # int8 scalar quantization of the HNSW index
+    SQ_TRAINING_LIMIT: int = 100_000  # Objects used to train the SQ codebook
+    SQ_RESCORE_LIMIT: int = 20  # Candidates rescored with full-precision vectors
+    # "cosine" or "dot" (embeddings are unit length, so dot ranks identically with less work).
+    # Applies to newly created collections; must match the metric of existing ones.
+    VECTOR_DISTANCE: str = os.getenv("VECTOR_DISTANCE", "cosine").lower()
     
     # Embedding Model Configuration
     EMBEDDING_MODEL: str = "all-mpnet-base-v2"
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")  # "torch" or "onnx" (int8 ONNX Runtime)
+    EMBEDDING_ONNX_DIR: str = os.getenv("EMBEDDING_ONNX_DIR", "./mpnet-onnx")  # Exported model + tokenizer
+    EMBEDDING_QUANTIZE: bool = os.getenv("EMBEDDING_QUANTIZE", "false").lower() == "true"  # int8 dynamic quantization (torch backend, CPU)
+    EMBEDDING_BATCH_MAX_SIZE: int = 16  # Max concurrent query embeddings encoded together
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 15  # Window to collect a batch after the first request
+    EMBEDDING_CACHE_SIZE: int = 10_000  # Cached query embeddings (~30 MB of float32 at 768d)
+    EMBEDDING_WORKERS: int = 2  # Threads in the dedicated embedding pool (torch releases the GIL)
     
     # AI Model Configuration
     GROQ_API_KEY: Optional[str] = os.getenv("GROQ_API_KEY")
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
     GROQ_TEMPERATURE: float = 0.1
+    LLM_CACHE_SIZE: int = 512  # Cached LLM answers (exact + semantic)
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.97  # Min cosine similarity to reuse an answer
+    # Answers are only cached when GROQ_TEMPERATURE is at or below this. The default 0.0 caches
+    # deterministic outputs only (so caching is off at the shipped temperature); raise it to opt in.
+    LLM_CACHE_MAX_TEMPERATURE: float = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.0"))
+    # Single gate for every cache that replays LLM output (AI answer caches and the response cache)
+    LLM_ANSWER_CACHING: bool = GROQ_TEMPERATURE <= LLM_CACHE_MAX_TEMPERATURE
     
     # Search Configuration
     SIMILARITY_THRESHOLD: float = 0.85
     DEFAULT_SEARCH_LIMIT: int = 5
+    RETRIEVAL_WORKERS: int = 8  # Threads for blocking Weaviate calls from async endpoints
+    COLLECTION_CACHE_TTL: int = 300  # seconds a known-existing collection skips the exists() check
+    
+    # Semantic (proximity) cache for similar-ticket lookups
+    PROXIMITY_CACHE_SIZE: int = 1024
+    PROXIMITY_CACHE_TOLERANCE: float = 0.05  # Max cosine distance to reuse a cached result
+    
+    # Exact-match cache for AI ticket responses (only active when LLM_ANSWER_CACHING)
+    RESPONSE_CACHE_SIZE: int = 2048
+    RESPONSE_CACHE_TTL: int = 3600  # seconds
 
 
 # Create a singleton instance
@@ -1,4 +1,22 @@
 """Database module for Weaviate client management."""
-from app.db.weaviate_client import weaviate_manager, get_weaviate_client
+from app.db.weaviate_client import (
+    weaviate_manager,
+    get_weaviate_client,
+    is_collection_not_found,
+    TICKET_PROPERTY_NAMES,
+    ticket_properties,
+    ticket_vector_index_config,
+    similarity_to_distance,
+    distance_to_similarity,
+)
 
-__all__ = ["weaviate_manager", "get_weaviate_client"]
+__all__ = [
+    "weaviate_manager",
+    "get_weaviate_client",
+    "is_collection_not_found",
+    "TICKET_PROPERTY_NAMES",
+    "ticket_properties",
+    "ticket_vector_index_config",
+    "similarity_to_distance",
+    "distance_to_similarity",
+]
@@ -2,12 +2,98 @@
 # Weaviate database client management.
 # Handles connection lifecycle and collection initialization.
 
+import logging          # standard library logging
+import re               # match Weaviate "missing collection" error messages
+import threading        # guard the collection handle cache (used from worker threads)
 import weaviate         # import weaviate client library
 import weaviate.classes as wvc      # import weaviate classes module
 from weaviate.classes.config import Property, DataType       # import Property and DataType for schema definition in a collection
-from typing import Optional         # import Optional type hint 
+from typing import List, Optional         # import type hints
+from cachetools import TTLCache     # expiring cache for collection handles
+from weaviate.collections import Collection      # import Collection handle type
 from app.core.config import settings     # import application settings
 
+logger = logging.getLogger(__name__)
+
+# Messages Weaviate (REST and gRPC) uses when a query targets a collection that doesn't exist
+_COLLECTION_NOT_FOUND_RE = re.compile(
+    r"could not find class|no such class|(class|collection) \S+ (was )?not found|not found in schema",
+    re.IGNORECASE
+)
+
+# Default ticket schema as (name, description) pairs - all properties are TEXT
+TICKET_PROPERTY_SPECS = (
+    ("ticket_id", "Unique ticket identifier"),
+    ("title", "Ticket title/summary"),
+    ("description", "Detailed problem description"),
+    ("category", "Issue category"),
+    ("status", "Ticket status (Open/Resolved)"),
+    ("severity", "Severity level"),
+    ("application", "Affected application/service"),
+    ("affected_users", "Impact scope"),
+    ("environment", "Environment (Production/Staging/etc)"),
+    ("solution", "Resolution steps"),
+    ("reasoning", "Root cause analysis"),
+    ("timestamp", "Ticket creation timestamp"),
+)
+TICKET_PROPERTY_NAMES = [name for name, _ in TICKET_PROPERTY_SPECS]
+
+
+def ticket_properties() -> List[Property]:
+    """Weaviate Property list for the default ticket schema (TICKET_PROPERTY_SPECS)."""
+    return [
+        Property(name=name, data_type=DataType.TEXT, description=description)
+        for name, description in TICKET_PROPERTY_SPECS
+    ]
+
+
+def ticket_vector_index_config():
+    """
+    HNSW index config for ticket collections: scalar quantization (int8 codes,
+    4x smaller than float32) with rescoring on the original vectors, and the
+    VECTOR_DISTANCE metric.
+    Returns None (Weaviate default index) when neither is customized.
+    """
+    use_dot = settings.VECTOR_DISTANCE == "dot"
+    if not settings.VECTOR_INDEX_SQ and not use_dot:
+        return None
+    
+    quantizer = None
+    if settings.VECTOR_INDEX_SQ:
+        quantizer = wvc.config.Configure.VectorIndex.Quantizer.sq(
+            training_limit=settings.SQ_TRAINING_LIMIT,
+            rescore_limit=settings.SQ_RESCORE_LIMIT
+        )
+    return wvc.config.Configure.VectorIndex.hnsw(
+        # Inner product on unit vectors equals cosine similarity, minus the normalization work
+        distance_metric=wvc.config.VectorDistances.DOT if use_dot else wvc.config.VectorDistances.COSINE,
+        quantizer=quantizer
+    )
+
+
+def similarity_to_distance(similarity: float) -> float:
+    """
+    Weaviate distance equivalent to a 0-1 similarity score (Weaviate "certainty",
+    (1 + cos) / 2) under the configured VECTOR_DISTANCE, for near_vector(distance=...).
+    """
+    if settings.VECTOR_DISTANCE == "dot":
+        return 1.0 - 2.0 * similarity  # dot distance = -cos for unit vectors
+    return 2.0 * (1.0 - similarity)  # cosine distance = 1 - cos
+
+
+def distance_to_similarity(distance):
+    """Inverse of similarity_to_distance (works on floats and NumPy arrays)."""
+    if settings.VECTOR_DISTANCE == "dot":
+        return (1.0 - distance) / 2.0
+    return 1.0 - distance / 2.0
+
+
+def is_collection_not_found(error: Exception) -> bool:
+    """Check whether a Weaviate error means the target collection doesn't exist."""
+    if getattr(error, "status_code", None) == 404:
+        return True
+    return _COLLECTION_NOT_FOUND_RE.search(str(error)) is not None
+
 
 class WeaviateManager:
     """Manager class for Weaviate client lifecycle."""
@@ -15,9 +101,18 @@ class WeaviateManager:
     # Initialize WeaviateManager with no client connected.
     def __init__(self): 
         self.client: Optional[weaviate.WeaviateClient] = None
+        # Collection handles by name, so hot paths skip the exists()/get() round-trips.
+        # Entries expire so a collection dropped by another process is re-checked eventually.
+        self._collection_cache: "TTLCache[str, Collection]" = TTLCache(
+            maxsize=256,
+            ttl=settings.COLLECTION_CACHE_TTL
+        )
+        self._collection_lock = threading.Lock()  # TTLCache mutates (expires) on reads
     
     def connect(self) -> bool:
        # Connect to Weaviate instance and verify connection.
+        self.invalidate_collection_cache()
+        
         try:
             # Connect to local Weaviate instance
             self.client = weaviate.connect_to_local(
@@ -28,28 +123,29 @@ class WeaviateManager:
             
             # Verify connection
             if self.client.is_ready():
-                print("✅ Successfully connected to Weaviate vector database")
+                logger.info("✅ Successfully connected to Weaviate vector database")
                 return True
             else:
-                print("⚠️ Weaviate client connected but not ready")
+                logger.warning("⚠️ Weaviate client connected but not ready")
                 return False
                 
         except Exception as e:
-            print(f"❌ Failed to connect to Weaviate: {str(e)}")
-            print("⚠️ Make sure Weaviate Docker container is running")
-            print("💡 Run: docker-compose up -d")
+            logger.error("❌ Failed to connect to Weaviate: %s", e, exc_info=True)
+            logger.warning("⚠️ Make sure Weaviate Docker container is running")
+            logger.info("💡 Run: docker-compose up -d")
             self.client = None
             return False
     
     def disconnect(self):
         """Close Weaviate connection."""
+        self.invalidate_collection_cache()
         if self.client is not None:
             try:
                 self.client.close()
-                print("✅ Weaviate connection closed successfully")
-                print("💾 Collection data is persisted in Weaviate (will be available on next startup)")
+                logger.info("✅ Weaviate connection closed successfully")
+                logger.info("💾 Collection data is persisted in Weaviate (will be available on next startup)")
             except Exception as e:
-                print(f"⚠️ Error closing Weaviate connection: {str(e)}")
+                logger.warning("⚠️ Error closing Weaviate connection: %s", e)
     
     def is_connected(self) -> bool:
         """Check if client is connected and ready."""
@@ -59,6 +155,94 @@ class WeaviateManager:
         """Get the Weaviate client instance."""
         return self.client
     
+    def get_or_check_collection(self, name: str) -> Optional[Collection]:
+        """
+        Get a collection handle, checking existence only on the first lookup
+        (and again once the cached handle is older than COLLECTION_CACHE_TTL).
+        
+        Args:
+            name: Collection name
+            
+        Returns:
+            Cached collection handle, or None if the collection does not exist
+        """
+        with self._collection_lock:
+            collection = self._collection_cache.get(name)
+        if collection is not None:
+            return collection
+        
+        if self.client is None or not self.client.collections.exists(name):
+            return None  # Misses aren't cached, so collections created later are picked up
+        
+        collection = self.client.collections.get(name)
+        with self._collection_lock:
+            self._collection_cache[name] = collection
+        return collection
+    
+    def get_collection(self, name: str) -> Optional[Collection]:
+        """
+        Get a collection handle without any existence check (no round-trip).
+        A missing collection surfaces as an error on the first query; callers
+        translate it with is_collection_not_found. Not for writes: Weaviate's
+        auto-schema would create the collection instead of failing.
+        
+        Args:
+            name: Collection name
+            
+        Returns:
+            Collection handle, or None if the client is not connected
+        """
+        with self._collection_lock:
+            collection = self._collection_cache.get(name)
+        if collection is not None:
+            return collection
+        if self.client is None:
+            return None
+        return self.client.collections.get(name)
+    
+    def invalidate_collection_cache(self, name: Optional[str] = None):
+        """Forget a cached collection handle (or all of them) after create/delete."""
+        with self._collection_lock:
+            if name is None:
+                self._collection_cache.clear()
+            else:
+                self._collection_cache.pop(name, None)
+    
+    def _ensure_quantization(self, name: str):
+        """Enable SQ on an existing collection created before quantization was configured."""
+        if not settings.VECTOR_INDEX_SQ:
+            return
+        
+        try:
+            collection = self.client.collections.get(name)
+            if collection.config.get().vector_index_config.quantizer is not None:
+                return  # Already quantized (SQ or another quantizer chosen deliberately)
+            
+            collection.config.update(
+                vector_index_config=wvc.config.Reconfigure.VectorIndex.hnsw(
+                    quantizer=wvc.config.Reconfigure.VectorIndex.Quantizer.sq(
+                        training_limit=settings.SQ_TRAINING_LIMIT,
+                        rescore_limit=settings.SQ_RESCORE_LIMIT
+                    )
+                )
+            )
+            logger.info("🗜️ Enabled scalar quantization on collection '%s'", name)
+        except Exception as e:
+            logger.warning("⚠️ Could not enable scalar quantization on '%s': %s", name, e)
+    
+    def _check_distance_metric(self, name: str):
+        """Warn when an existing collection's metric differs from VECTOR_DISTANCE (it can't be changed in place)."""
+        try:
+            metric = self.client.collections.get(name).config.get().vector_index_config.distance_metric
+            if metric is not None and metric.value != settings.VECTOR_DISTANCE:
+                logger.warning(
+                    "⚠️ Collection '%s' uses the '%s' metric but VECTOR_DISTANCE is '%s' - similarity scores "
+                    "will be wrong. Recreate the collection or set VECTOR_DISTANCE=%s.",
+                    name, metric.value, settings.VECTOR_DISTANCE, metric.value
+                )
+        except Exception as e:
+            logger.warning("⚠️ Could not read the distance metric of '%s': %s", name, e)
+    
     def initialize_collections(self):
         """Initialize default collections on startup."""
         if self.client is None:
@@ -70,35 +254,26 @@ class WeaviateManager:
             collection_exists = self.client.collections.exists(settings.TICKETS_COLLECTION_NAME)
             
             if collection_exists:
-                print(f"✅ Collection '{settings.TICKETS_COLLECTION_NAME}' already exists (using existing collection)")
+                logger.info("✅ Collection '%s' already exists (using existing collection)", settings.TICKETS_COLLECTION_NAME)
+                self._ensure_quantization(settings.TICKETS_COLLECTION_NAME)
+                self._check_distance_metric(settings.TICKETS_COLLECTION_NAME)
             else:
-                print(f"📝 Collection '{settings.TICKETS_COLLECTION_NAME}' not found - creating new collection...")
+                logger.info("📝 Collection '%s' not found - creating new collection...", settings.TICKETS_COLLECTION_NAME)
                 
                 # Create collection with proper schema for tickets
                 self.client.collections.create(
                     name=settings.TICKETS_COLLECTION_NAME,
                     description="Support ticket incidents with AI-generated solutions",
                     vectorizer_config=wvc.config.Configure.Vectorizer.none(),  # No automatic vectorization
-                    properties=[
-                        Property(name="ticket_id", data_type=DataType.TEXT, description="Unique ticket identifier"),
-                        Property(name="title", data_type=DataType.TEXT, description="Ticket title/summary"),
-                        Property(name="description", data_type=DataType.TEXT, description="Detailed problem description"),
-                        Property(name="category", data_type=DataType.TEXT, description="Issue category"),
-                        Property(name="status", data_type=DataType.TEXT, description="Ticket status (Open/Resolved)"),
-                        Property(name="severity", data_type=DataType.TEXT, description="Severity level"),
-                        Property(name="application", data_type=DataType.TEXT, description="Affected application/service"),
-                        Property(name="affected_users", data_type=DataType.TEXT, description="Impact scope"),
-                        Property(name="environment", data_type=DataType.TEXT, description="Environment (Production/Staging/etc)"),
-                        Property(name="solution", data_type=DataType.TEXT, description="Resolution steps"),
-                        Property(name="reasoning", data_type=DataType.TEXT, description="Root cause analysis"),
-                        Property(name="timestamp", data_type=DataType.TEXT, description="Ticket creation timestamp"),
-                    ]
+                    vector_index_config=ticket_vector_index_config(),  # SQ-compressed HNSW, VECTOR_DISTANCE metric
+                    properties=ticket_properties()
                 )
-                print(f"✅ Collection '{settings.TICKETS_COLLECTION_NAME}' created successfully with empty data")
-                print(f"ℹ️  Using local embeddings (sentence-transformers) for vectorization")
+                self.invalidate_collection_cache(settings.TICKETS_COLLECTION_NAME)
+                logger.info("✅ Collection '%s' created successfully with empty data", settings.TICKETS_COLLECTION_NAME)
+                logger.info("ℹ️  Using local embeddings (sentence-transformers) for vectorization")
                 
         except Exception as e:
-            print(f"⚠️ Error handling collection: {str(e)}")
+            logger.warning("⚠️ Error handling collection: %s", e, exc_info=True)
 
 
 # Make class object available globally
@@ -2,14 +2,27 @@
 Main application module.
 FastAPI application setup and lifecycle management.
 """
+import importlib.util
+import logging
 from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.db import weaviate_manager
-from app.services import embedding_service
+from app.services.embedding_service import embedding_service
+from app.services.embedding_batcher import embedding_batcher
+from app.services.ticket_service import ticket_service
+from app.services.ai_service import ai_service
 from app.api import health, collections, tickets
 
+# One logging setup shared by every module (level via LOG_LEVEL)
+logging.basicConfig(
+    level=settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s"
+)
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -18,10 +31,27 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events using modern async context manager.
     """
     # STARTUP: Initialize services
-    print("🚀 Starting application...")
+    logger.info("🚀 Starting application...")
     
-    # Load embedding model
+    # Load embedding model and warm it up (first encode is much slower than steady state)
     embedding_service.load_model()
+    embedding_service.warmup()
+    
+    # Dedicated thread pool for model inference (keeps the event loop free)
+    app.state.embed_pool = embedding_service.start_executor(settings.EMBEDDING_WORKERS)
+    
+    # Start batching worker for concurrent query embeddings
+    await embedding_batcher.start()
+    
+    # Shared HTTP connection pool for outbound calls (Groq); HTTP/2 when h2 is installed
+    app.state.http_client = httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=30,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    
+    # Build the LLM client once, on the shared pool
+    ai_service.init_llm(http_async_client=app.state.http_client)
     
     # Connect to Weaviate
     connected = weaviate_manager.connect()
@@ -34,7 +64,11 @@ async def lifespan(app: FastAPI):
     yield
     
     # SHUTDOWN: Cleanup
-    print("🛑 Shutting down application...")
+    logger.info("🛑 Shutting down application...")
+    await embedding_batcher.stop()
+    embedding_service.shutdown_executor()
+    ticket_service.shutdown()
+    await app.state.http_client.aclose()
     weaviate_manager.disconnect()
 
 
@@ -58,8 +92,10 @@ app.add_middleware(
         "http://127.0.0.1:3000",
     ],
     allow_credentials=True,
-    allow_methods=["*"],  # Allow all HTTP methods (GET, POST, DELETE, etc.)
-    allow_headers=["*"],  # Allow all headers
+    # Explicit lists (not "*") so browsers can cache the preflight response
+    allow_methods=["GET", "POST", "DELETE"],  # Methods the API exposes
+    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+    max_age=86400,  # Cache preflight results for 24h
 )
 
 # Include routers
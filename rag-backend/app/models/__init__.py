@@ -1,4 +1,4 @@
-"""Models module for Pydantic schemas."""
+"""Models module for Pydantic schemas and internal result types."""
 from app.models.schemas import (
     TicketModel,
     TicketSubmissionModel,
@@ -7,6 +7,7 @@ from app.models.schemas import (
     CollectionPropertyModel,
     CreateCollectionModel,
 )
+from app.models.similar_tickets import SimilarTickets
 
 __all__ = [
     "TicketModel",
@@ -15,4 +16,5 @@ __all__ = [
     "AITicketResponse",
     "CollectionPropertyModel",
     "CreateCollectionModel",
+    "SimilarTickets",
 ]
@@ -2,6 +2,7 @@
 Pydantic models for request/response validation.
 Contains all data models used throughout the application.
 """
+from functools import cached_property  # computed once per model instance
 from typing import Optional, Dict, Any, List  # import type hints
 from pydantic import BaseModel  # import BaseModel for Pydantic models
 
@@ -22,6 +23,11 @@ class TicketModel(BaseModel):
     solution: str
     reasoning: str
     timestamp: str
+    
+    @cached_property
+    def embed_text(self) -> str:
+        """Text used to embed the ticket (title + description + solution)."""
+        return f"{self.title} {self.description} {self.solution}"
 
 
 class TicketSubmissionModel(BaseModel):
@@ -34,6 +40,11 @@ class TicketSubmissionModel(BaseModel):
     affected_users: str = ""
     environment: str = "Production"
     collection_name: Optional[str] = None  # Collection to search for similar tickets
+    
+    @cached_property
+    def query_text(self) -> str:
+        """Text used to search for similar tickets (title + description + application)."""
+        return f"{self.title} {self.description} {self.application}"
 
 
 # ===================== RESPONSE MODELS =====================
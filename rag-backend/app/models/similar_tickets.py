@@ -0,0 +1,94 @@
+"""
+Similar-ticket search results in a column-oriented (struct-of-arrays) layout.
+Scores live in one NumPy array, so thresholding and reordering are single
+vectorized operations instead of per-dict Python loops.
+"""
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Iterable, List
+import numpy as np
+
+
+@dataclass(frozen=True, eq=False)
+class SimilarTickets:
+    """Parallel columns of similar tickets; index i across all fields is one ticket."""
+    ticket_ids: List[str] = field(default_factory=list)
+    titles: List[str] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+    solutions: List[str] = field(default_factory=list)
+    reasonings: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    severities: List[str] = field(default_factory=list)
+    scores: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    
+    def __post_init__(self):
+        # Results are shared through the caches, so the scores must not change in place
+        self.scores.setflags(write=False)
+    
+    def __len__(self) -> int:
+        return len(self.ticket_ids)
+    
+    @cached_property
+    def similarity_percents(self) -> List[str]:
+        """Scores formatted for display ("92.3%"), computed once per result (results are reused via the caches)."""
+        return [f"{percent:.1f}%" for percent in (self.scores * 100).tolist()]
+    
+    @classmethod
+    def from_dicts(cls, tickets: Iterable[Dict]) -> "SimilarTickets":
+        """Build from the row-oriented dicts (ticket_id, title, ..., similarity_score)."""
+        tickets = list(tickets)
+        return cls(
+            ticket_ids=[t.get("ticket_id", "N/A") for t in tickets],
+            titles=[t.get("title", "") for t in tickets],
+            descriptions=[t.get("description", "") for t in tickets],
+            solutions=[t.get("solution", "") for t in tickets],
+            reasonings=[t.get("reasoning", "") for t in tickets],
+            categories=[t.get("category", "") for t in tickets],
+            severities=[t.get("severity", "") for t in tickets],
+            scores=np.fromiter((t["similarity_score"] for t in tickets), dtype=np.float64, count=len(tickets))
+        )
+    
+    def take(self, indices) -> "SimilarTickets":
+        """Select (and reorder) tickets by position."""
+        indices = np.asarray(indices, dtype=np.intp)
+        
+        def pick(column: List[str]) -> List[str]:
+            return [column[i] for i in indices]
+        
+        return SimilarTickets(
+            ticket_ids=pick(self.ticket_ids),
+            titles=pick(self.titles),
+            descriptions=pick(self.descriptions),
+            solutions=pick(self.solutions),
+            reasonings=pick(self.reasonings),
+            categories=pick(self.categories),
+            severities=pick(self.severities),
+            scores=self.scores[indices]
+        )
+    
+    def above(self, threshold: float) -> "SimilarTickets":
+        """Keep tickets whose score is at least `threshold` (one vectorized comparison)."""
+        return self.take(np.flatnonzero(self.scores >= threshold))
+    
+    def by_score(self) -> "SimilarTickets":
+        """Tickets ordered by descending score."""
+        return self.take(np.argsort(-self.scores, kind="stable"))
+    
+    def to_dicts(self) -> List[Dict]:
+        """Row-oriented view (one dict per ticket), e.g. for JSON output."""
+        return [
+            {
+                "ticket_id": ticket_id,
+                "title": title,
+                "description": description,
+                "solution": solution,
+                "reasoning": reasoning,
+                "category": category,
+                "severity": severity,
+                "similarity_score": score
+            }
+            for ticket_id, title, description, solution, reasoning, category, severity, score in zip(
+                self.ticket_ids, self.titles, self.descriptions, self.solutions,
+                self.reasonings, self.categories, self.severities, self.scores.tolist()
+            )
+        ]
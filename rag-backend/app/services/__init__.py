@@ -1,21 +1,42 @@
-"""Services module for business logic."""
-from app.services.embedding_service import embedding_service, get_embedding_service
-from app.services.ai_service import ai_service, get_ai_service
-from app.services.ticket_service import ticket_service, get_ticket_service
-from app.services.prompts import (
-    prompt_config,
-    prompt_manager,
-    get_ticket_resolution_prompt,
-)
+"""
+Services module for business logic.
 
-__all__ = [
-    "embedding_service",
-    "get_embedding_service",
-    "ai_service",
-    "get_ai_service",
-    "ticket_service",
-    "get_ticket_service",
-    "prompt_config",
-    "prompt_manager",
-    "get_ticket_resolution_prompt",
-]
+Each service singleton lives in the submodule of the same name and is imported
+from there (e.g. `from app.services.ticket_service import ticket_service`), so
+`app.services.<name>` always refers to the submodule. The dependency getters and
+prompt helpers below are re-exported lazily (PEP 562): importing one light
+submodule (e.g. prompts) doesn't pull in every service's dependencies.
+"""
+from importlib import import_module
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "get_embedding_service": "embedding_service",
+    "get_embedding_batcher": "embedding_batcher",
+    "get_ai_service": "ai_service",
+    "get_ticket_service": "ticket_service",
+    "get_proximity_cache": "proximity_cache",
+    "get_response_cache": "response_cache",
+    "prompt_config": "prompts",
+    "prompt_manager": "prompts",
+    "get_ticket_resolution_prompt": "prompts",
+    "build_prompt_variables": "prompts",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the submodule that provides `name` on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(import_module(f"{__name__}.{module_name}"), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -2,11 +2,25 @@
 AI service for generating ticket solutions using LLM with LangChain.
 Handles root cause analysis and solution generation using structured prompts.
 """
-from typing import Dict, List, Tuple  
-from langchain_groq import ChatGroq 
-from langchain_core.output_parsers import StrOutputParser
+import hashlib
+import json
+import logging
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple  
+import httpx
+import numpy as np
+from cachetools import LRUCache
 from app.core.config import settings
-from app.services.prompts import get_ticket_resolution_prompt, prompt_config
+from app.models import SimilarTickets
+from app.services.embedding_batcher import embedding_batcher
+from app.services.proximity_cache import ProximityCache
+from app.services.prompts import build_prompt_variables, prompt_config, prompt_manager
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+    from langchain_groq import ChatGroq
+
+logger = logging.getLogger(__name__)
 
 
 class AIService:
@@ -14,68 +28,242 @@ class AIService:
     
     def __init__(self):
         """Initialize the AI service with LangChain components."""
+        # LangChain/Groq modules are imported on first use to keep process start fast
         self.llm = None
-        self.output_parser = StrOutputParser()
+        self.output_parser = None
+        # Compiled prompt | llm | parser chains, keyed by include_example
+        self._chains: Dict[bool, "Runnable"] = {}
+        
+        # Answer caches: exact prompt hash first, then semantic match on the ticket text.
+        # Semantic entries are namespaced by the retrieved ticket IDs, so an answer is
+        # only reused when it was grounded on the same similar tickets.
+        # Caching is skipped when GROQ_TEMPERATURE makes answers vary between calls.
+        self._cache_enabled = settings.LLM_ANSWER_CACHING
+        self._exact_cache = LRUCache(maxsize=settings.LLM_CACHE_SIZE)
+        self._exact_lock = threading.Lock()  # also guards stats
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        self._semantic_cache = ProximityCache(
+            capacity=settings.LLM_CACHE_SIZE,
+            tolerance=1.0 - settings.LLM_SEMANTIC_CACHE_THRESHOLD
+        )
+    
+    def init_llm(self, http_async_client: Optional[httpx.AsyncClient] = None):
+        """
+        Build the LLM client once at startup.
+        
+        Args:
+            http_async_client: Shared httpx client (connection pool) for async Groq calls
+        """
+        try:
+            self.llm = self._build_llm(http_async_client)
+            self._chains.clear()
+            logger.info("✅ Groq LLM client initialized")
+        except ValueError as e:
+            # Requests will report the missing key via the usual error messages
+            logger.warning("⚠️ %s", e)
+    
+    def _build_llm(self, http_async_client: Optional[httpx.AsyncClient] = None) -> "ChatGroq":
+        """Create the ChatGroq instance."""
+        if not settings.GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY not found in environment variables")
+        
+        from langchain_groq import ChatGroq
+        
+        return ChatGroq(
+            model=settings.GROQ_MODEL,
+            temperature=settings.GROQ_TEMPERATURE,
+            api_key=settings.GROQ_API_KEY,
+            http_async_client=http_async_client
+        )
     
-    def _get_llm(self) -> ChatGroq:
-        """Get or create the LLM instance."""
+    def _get_llm(self) -> "ChatGroq":
+        """Get the LLM instance (built lazily only if init_llm wasn't called at startup)."""
+        if self.output_parser is None:
+            from langchain_core.output_parsers import StrOutputParser
+            self.output_parser = StrOutputParser()
         if self.llm is None:
-            if not settings.GROQ_API_KEY:
-                raise ValueError("GROQ_API_KEY not found in environment variables")
-            
-            self.llm = ChatGroq(
-                model=settings.GROQ_MODEL,
-                temperature=settings.GROQ_TEMPERATURE,
-                api_key=settings.GROQ_API_KEY
-            )
+            self.llm = self._build_llm()
         return self.llm
     
-    def generate_solution(self, ticket_data: Dict, similar_tickets: List[Dict]) -> Tuple[str, str]:
+    def _get_chain(self, include_example: bool = True) -> "Runnable":
+        """Get the compiled prompt | llm | parser chain (built once per LLM instance)."""
+        chain = self._chains.get(include_example)
+        if chain is None:
+            llm = self._get_llm()
+            chain = prompt_manager.get_chat_prompt(include_example) | llm | self.output_parser
+            self._chains[include_example] = chain
+        return chain
+    
+    @staticmethod
+    def _semantic_text(ticket_data: Dict) -> str:
+        """Ticket text embedded for the semantic answer cache."""
+        return f"{ticket_data.get('title', '')} {ticket_data.get('description', '')} {ticket_data.get('category', '')}"
+    
+    @staticmethod
+    def _context_key(similar_tickets: SimilarTickets) -> str:
+        """Namespace for semantic cache entries: the retrieved tickets the answer is grounded on."""
+        return "|".join(similar_tickets.ticket_ids)
+    
+    @staticmethod
+    def _exact_key(prompt_variables: Dict) -> str:
+        """SHA-256 over model, temperature and the fully rendered prompt variables."""
+        payload = json.dumps(
+            {"model": settings.GROQ_MODEL, "temperature": settings.GROQ_TEMPERATURE, "variables": prompt_variables},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def _cached_answer(
+        self,
+        ticket_data: Dict,
+        exact_key: str,
+        context_key: str
+    ) -> Tuple[Optional[Tuple[str, str]], Optional[np.ndarray]]:
+        """
+        Look up an answer by exact prompt hash, then by semantic similarity.
+        The ticket text is only embedded when caching is enabled and the exact
+        lookup missed; an embedding failure counts as a miss.
+        
+        Returns:
+            Tuple of (cached answer or None, ticket embedding or None if not computed)
+        """
+        if not self._cache_enabled:
+            return None, None
+        
+        with self._exact_lock:
+            answer = self._exact_cache.get(exact_key)
+            if answer is not None:
+                self.stats["exact_hits"] += 1
+                return answer, None
+        
+        try:
+            query_embedding = await embedding_batcher.embed(self._semantic_text(ticket_data))
+        except Exception:
+            logger.warning("Semantic answer cache lookup skipped: embedding failed", exc_info=True)
+            with self._exact_lock:
+                self.stats["misses"] += 1
+            return None, None
+        
+        answer = self._semantic_cache.lookup(context_key, query_embedding)
+        with self._exact_lock:
+            self.stats["semantic_hits" if answer is not None else "misses"] += 1
+        return answer, query_embedding
+    
+    def _remember_answer(self, exact_key: str, context_key: str, query_embedding, answer: Tuple[str, str]):
+        """Cache a successful answer (generation errors are never cached)."""
+        if not self._cache_enabled:
+            return
+        reasoning, solution = answer
+        if reasoning.startswith("Unable to generate") or solution.startswith("Unable to generate"):
+            return
+        with self._exact_lock:
+            self._exact_cache[exact_key] = answer
+        # Semantic entry only if the ticket was embedded during the lookup
+        if query_embedding is not None:
+            self._semantic_cache.insert(context_key, query_embedding, answer)
+    
+    def cache_stats(self) -> Dict:
+        """Answer cache hit/miss counters and current size."""
+        with self._exact_lock:
+            return {
+                "enabled": self._cache_enabled,
+                "size": len(self._exact_cache),
+                **self.stats
+            }
+    
+    def clear_cache(self) -> int:
+        """Drop all cached answers (call when ticket data changes). Returns exact entries removed."""
+        with self._exact_lock:
+            removed = len(self._exact_cache)
+            self._exact_cache.clear()
+        self._semantic_cache.invalidate()
+        return removed
+    
+    async def agenerate_solution(self, ticket_data: Dict, similar_tickets: SimilarTickets) -> Tuple[str, str]:
         """
         Generate solution using LangChain ChatPromptTemplate with structured messages.
+        The Groq call is awaited (chain.ainvoke), so the event loop stays free
+        while the LLM responds.
         
         Args:
             ticket_data: Dictionary containing ticket information (User Input Tickets)
-            similar_tickets: List of similar tickets from vector DB (Retrieved from Cosine-Similarity)
+            similar_tickets: Similar tickets from vector DB (Retrieved from Cosine-Similarity)
             
         Returns:
             Tuple of (reasoning, solution)
         """
         try:
-            # Get LLM instance
-            llm = self._get_llm()
+            # Precompiled chain (with few-shot example); only the variables are built per request
+            chain = self._get_chain(include_example=True)
+            prompt_variables = build_prompt_variables(ticket_data, similar_tickets)
             
-            # Get LangChain ChatPromptTemplate and variables
-            chat_prompt, prompt_variables = get_ticket_resolution_prompt(
-                ticket_data, 
-                similar_tickets,
-                include_example=True  # Include few-shot example
-            )
+            # Reuse a cached answer for the same prompt or a near-identical ticket
+            exact_key = self._exact_key(prompt_variables)
+            context_key = self._context_key(similar_tickets)
+            cached, query_embedding = await self._cached_answer(ticket_data, exact_key, context_key)
+            if cached is not None:
+                return cached
             
-            # Create LangChain chain: Prompt -> LLM -> Output Parser
-            chain = chat_prompt | llm | self.output_parser
+            # Execute the chain without blocking the event loop
+            response_text = await chain.ainvoke(prompt_variables)
             
-            # Execute the chain
-            response_text = chain.invoke(prompt_variables)
+            answer = self._parse_response(response_text)
+            self._remember_answer(exact_key, context_key, query_embedding, answer)
+            return answer
+        
+        except Exception as e:
+            return self._handle_error(e)
+    
+    async def astream_solution(self, ticket_data: Dict, similar_tickets: SimilarTickets) -> AsyncIterator[Dict]:
+        """
+        Stream the solution as it is generated (same prompt as agenerate_solution).
+        
+        Yields {"token": str} for each chunk of LLM output, then one final
+        {"reasoning": str, "solution": str} parsed from the full response
+        (or the usual error messages if generation fails). Cached answers
+        produce only the final event.
+        
+        Args:
+            ticket_data: Dictionary containing ticket information (User Input Tickets)
+            similar_tickets: Similar tickets from vector DB (Retrieved from Cosine-Similarity)
+        """
+        chunks = []
+        try:
+            # Precompiled chain (with few-shot example); only the variables are built per request
+            chain = self._get_chain(include_example=True)
+            prompt_variables = build_prompt_variables(ticket_data, similar_tickets)
             
-            # Parse reasoning and solution
-            reasoning, solution = self._parse_response(response_text)
+            # A cached answer is returned whole, without token events
+            exact_key = self._exact_key(prompt_variables)
+            context_key = self._context_key(similar_tickets)
+            cached, query_embedding = await self._cached_answer(ticket_data, exact_key, context_key)
             
-            return reasoning, solution
+            if cached is not None:
+                reasoning, solution = cached
+            else:
+                # Stream tokens from Groq as they arrive
+                async for chunk in chain.astream(prompt_variables):
+                    chunks.append(chunk)
+                    yield {"token": chunk}
+                
+                reasoning, solution = self._parse_response("".join(chunks))
+                self._remember_answer(exact_key, context_key, query_embedding, (reasoning, solution))
         
         except Exception as e:
-            return self._handle_error(e)
+            reasoning, solution = self._handle_error(e)
+        
+        yield {"reasoning": reasoning, "solution": solution}
     
     def _parse_response(self, response_text: str) -> Tuple[str, str]:
         """Parse the LLM response into reasoning and solution."""
-        reasoning = ""
-        solution = ""
-        
-        # Use centralized markers from prompt config
-        if prompt_config.ROOT_CAUSE_MARKER in response_text and prompt_config.RESOLUTION_MARKER in response_text:
-            parts = response_text.split(prompt_config.RESOLUTION_MARKER)
-            reasoning = parts[0].replace(prompt_config.ROOT_CAUSE_MARKER, "").strip()
-            solution = parts[1].strip()
+        # Use centralized markers from prompt config (one pass to find the split point)
+        head, sep, tail = response_text.partition(prompt_config.RESOLUTION_MARKER)
+        root_cause_at = head.find(prompt_config.ROOT_CAUSE_MARKER) if sep else -1
+        if root_cause_at >= 0:
+            # Cut the marker out by position (no second scan); any preamble before it is kept
+            marker_end = root_cause_at + len(prompt_config.ROOT_CAUSE_MARKER)
+            reasoning = (head[:root_cause_at] + head[marker_end:]).strip()
+            solution = tail.strip()
         else:
             # Fallback if format is not followed
             lines = response_text.split("\n", 1)
@@ -0,0 +1,153 @@
+"""
+Dynamic batching for query embeddings.
+Coalesces embedding requests that arrive within a short window into a single
+model.encode call, then hands each caller its own vector.
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.embedding_service import embedding_service
+
+
+class EmbeddingBatcher:
+    """Queues concurrent embedding requests and encodes them in batches."""
+    
+    def __init__(self, max_batch_size: int = 16, max_wait_ms: float = 15):
+        """
+        Args:
+            max_batch_size: Maximum number of texts encoded together
+            max_wait_ms: How long to wait for more requests after the first one arrives
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Requests the worker has taken off the queue but not answered yet
+        self._batch: List[Tuple[str, asyncio.Future]] = []
+        # Single-flight: texts currently being embedded -> the task computing them
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    def is_running(self) -> bool:
+        """Check if the background worker is running."""
+        return self._worker is not None and not self._worker.done()
+    
+    async def start(self):
+        """Start the background batching worker (call from app lifespan)."""
+        if self.is_running():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background worker and fail every request it has not answered."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        
+        # Queued requests (and the batch the cancelled worker held) would otherwise wait forever
+        pending = self._batch
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("batcher stopped"))
+        
+        # Single-flight tasks awaiting those futures now finish with the same error
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        self._inflight.clear()
+        self._batch = []
+        self._worker = None
+        self._queue = None
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Get the embedding for a text, batched with other concurrent requests.
+        
+        Args:
+            text: Input text to embed
+        
+        Returns:
+            Read-only float32 embedding vector (shared with the embedding cache)
+        """
+        # Recently embedded texts are served from the embedding cache
+        cached = embedding_service.get_cached_embedding(text)
+        if cached is not None:
+            return cached
+        
+        # Concurrent requests for the same text share one computation
+        task = self._inflight.get(text)
+        if task is None:
+            task = asyncio.ensure_future(self._embed_uncached(text))
+            self._inflight[text] = task
+            task.add_done_callback(lambda _: self._inflight.pop(text, None))
+        
+        # shield: a cancelled caller must not cancel the computation others are waiting on
+        return await asyncio.shield(task)
+    
+    async def _embed_uncached(self, text: str) -> np.ndarray:
+        """Embed a text through the batching worker (or directly if it isn't running)."""
+        if not self.is_running():
+            # No worker (e.g. lifespan not run) - encode directly off the event loop
+            return await embedding_service.aencode(text)
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or the window closes."""
+        batch = self._batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _run(self):
+        """Worker loop: collect a batch, encode it in the embedding pool, resolve the futures."""
+        while True:
+            batch = await self._collect_batch()
+            texts = [text for text, _ in batch]
+            
+            try:
+                embeddings = await embedding_service.aencode_many(texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._batch = []
+                continue
+            
+            for (text, future), embedding in zip(batch, embeddings):
+                vector = embedding_service.cache_embedding(text, embedding)
+                if not future.done():
+                    future.set_result(vector)
+            self._batch = []
+
+
+# Global instance
+embedding_batcher = EmbeddingBatcher(
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+    max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+)
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """
+    Dependency function to get the embedding batcher.
+    Used by FastAPI endpoints.
+    """
+    return embedding_batcher
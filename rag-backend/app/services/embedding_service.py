@@ -2,31 +2,252 @@
 Embedding service for text vectorization.
 Handles loading and using the sentence transformer model.
 """
-from typing import List, Optional
-from sentence_transformers import SentenceTransformer
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional, Union
+import numpy as np
+from cachetools import LRUCache
 from fastapi import HTTPException, status
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbeddingModel:
+    """
+    int8-quantized ONNX export of the sentence transformer, run with ONNX Runtime.
+    
+    Produces the same mean-pooled, L2-normalized 768-dim vectors as the
+    SentenceTransformer model, so existing Weaviate data stays compatible.
+    Export once (needs optimum[onnxruntime]) with:
+        python -c "from app.services.embedding_service import OnnxEmbeddingModel; OnnxEmbeddingModel.export('./mpnet-onnx')"
+    """
+    
+    def __init__(self, model_dir: str, model_file: str = "model.int8.onnx"):
+        # Optional dependencies, only needed for the ONNX backend
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        # Full graph fusions; intra-op threads bounded since several embedding workers share the cores
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = min(4, os.cpu_count() or 1)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+    
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode text(s) like SentenceTransformer.encode (a single string returns a 1-D vector)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=384,  # all-mpnet-base-v2 max_seq_length
+                return_tensors="np"
+            )
+            feeds = {name: value for name, value in encoded.items() if name in self.input_names}
+            token_embeddings = self.session.run(None, feeds)[0]
+            
+            # Mean pooling over non-padding tokens, then L2 normalization
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.sqrt(np.einsum("ij,ij->i", pooled, pooled))[:, None]  # row norms without linalg.norm dispatch
+            chunks.append(pooled / np.clip(norms, 1e-12, None))
+        
+        embeddings = np.concatenate(chunks) if chunks else np.empty((0, 768), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+    
+    @staticmethod
+    def export(output_dir: str, model_name: Optional[str] = None, model_file: str = "model.int8.onnx"):
+        """
+        Export the sentence transformer to ONNX with optimum and quantize it to int8
+        (dynamic quantization, AVX-512 VNNI kernels; falls back to plain int8 GEMM on older CPUs).
+        
+        Args:
+            output_dir: Directory for the quantized model and tokenizer (EMBEDDING_ONNX_DIR)
+            model_name: Hugging Face model id (default: sentence-transformers/<EMBEDDING_MODEL>)
+            model_file: File name of the quantized model
+        """
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        if model_name is None:
+            model_name = settings.EMBEDDING_MODEL
+            if "/" not in model_name:
+                model_name = f"sentence-transformers/{model_name}"
+        
+        # Export with optimum (applies transformer-specific graph fusions, unlike a bare torch.onnx.export)
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(output_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+        
+        # Dynamic int8 quantization: weights quantized offline, activations at runtime
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=output_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        os.replace(os.path.join(output_dir, "model_quantized.onnx"), os.path.join(output_dir, model_file))
+
 
 class EmbeddingService:
     """Service for generating text embeddings."""
     
+    # Guards model loading so concurrent cold requests can't load it twice
+    _model_lock = threading.Lock()
+    
     def __init__(self):
-        self.model: Optional[SentenceTransformer] = None
+        self.model: Optional[Union["SentenceTransformer", OnnxEmbeddingModel]] = None
+        # Dedicated threads for model.encode so inference never runs on the event loop
+        self.executor: Optional[ThreadPoolExecutor] = None
+        # Recently embedded texts -> read-only float32 vectors, keyed by a 128-bit text hash
+        self._cache = LRUCache(maxsize=settings.EMBEDDING_CACHE_SIZE)
+        self._cache_lock = threading.Lock()  # encode runs on several pool threads
     
     def load_model(self):
-        """Load the embedding model."""
+        """Load the embedding model (at most once, even when called from several threads)."""
+        if self.model is not None:
+            return
+        
+        with self._model_lock:
+            # Another thread may have finished loading while we waited
+            if self.model is not None:
+                return
+            
+            try:
+                if settings.EMBEDDING_BACKEND == "onnx":
+                    self.model = OnnxEmbeddingModel(settings.EMBEDDING_ONNX_DIR)
+                else:
+                    # Imported here: pulls in torch/transformers, which dominates import time
+                    import torch
+                    from sentence_transformers import SentenceTransformer
+                    # Bound intra-op threads: several embedding workers share the cores
+                    torch.set_num_threads(min(4, os.cpu_count() or 1))
+                    model = SentenceTransformer(settings.EMBEDDING_MODEL, device="cpu" if settings.EMBEDDING_QUANTIZE else None)
+                    if settings.EMBEDDING_QUANTIZE:
+                        # int8 weights for every Linear layer (activations quantized on the fly)
+                        torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+                    self.model = model
+                quantized = " int8" if settings.EMBEDDING_QUANTIZE and settings.EMBEDDING_BACKEND != "onnx" else ""
+                logger.info("✅ Embedding model loaded successfully (%s%s)", settings.EMBEDDING_BACKEND, quantized)
+            except Exception:
+                logger.exception("❌ Failed to load embedding model")
+                self.model = None
+    
+    def warmup(self):
+        """
+        Run one throwaway encode so kernel selection and allocator setup happen
+        at startup instead of on the first user request.
+        """
+        if self.model is None:
+            return
         try:
-            self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
-            print("✅ Embedding model loaded successfully")
-        except Exception as e:
-            print(f"❌ Failed to load embedding model: {str(e)}")
-            self.model = None
+            self.model.encode("warmup " * 32, normalize_embeddings=True)
+            logger.info("✅ Embedding model warmed up")
+        except Exception:
+            logger.warning("⚠️ Embedding warmup failed", exc_info=True)
+    
+    def start_executor(self, max_workers: int = 2) -> ThreadPoolExecutor:
+        """Create the thread pool used by the async encode helpers."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embed")
+        return self.executor
+    
+    def shutdown_executor(self):
+        """Shut down the embedding thread pool."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """128-bit blake2b digest of the whitespace-normalized text (cheaper to keep than the text itself)."""
+        # The tokenizer splits on whitespace, so runs/leading/trailing spaces don't change the embedding
+        normalized = " ".join(text.split())
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+    
+    def get_cached_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached (read-only) embedding for a text, or None."""
+        key = self._cache_key(text)
+        with self._cache_lock:
+            return self._cache.get(key)
+    
+    def cache_embedding(self, text: str, embedding) -> np.ndarray:
+        """Store an embedding for a text as a read-only float32 array and return it."""
+        vector = np.array(embedding, dtype=np.float32)  # always a private copy
+        vector.setflags(write=False)  # callers can't mutate cached storage
+        key = self._cache_key(text)
+        with self._cache_lock:
+            self._cache[key] = vector
+        return vector
+    
+    def cache_clear(self) -> int:
+        """Drop all cached embeddings (e.g. between tests). Returns how many were removed."""
+        with self._cache_lock:
+            removed = len(self._cache)
+            self._cache.clear()
+        return removed
     
     def is_loaded(self) -> bool:
         """Check if model is loaded."""
         return self.model is not None
     
+    def generate_embedding_array(self, text: str) -> np.ndarray:
+        """
+        Generate embedding vector for text as a float32 NumPy array.
+        Weaviate and the caches accept arrays directly, so prefer this over
+        generate_embedding unless a plain list is needed (e.g. JSON output).
+        
+        Args:
+            text: Input text to embed
+            
+        Returns:
+            Read-only float32 array holding the L2-normalized embedding
+            
+        Raises:
+            HTTPException: If the model could not be loaded
+        """
+        # Load lazily if startup didn't (e.g. lifespan skipped in tests)
+        if self.model is None:
+            self.load_model()
+        if self.model is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Embedding model not initialized"
+            )
+        
+        # Repeated texts skip the model forward pass
+        cached = self.get_cached_embedding(text)
+        if cached is not None:
+            return cached
+        
+        try:
+            embedding = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+            return self.cache_embedding(text, embedding)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error generating embedding: {str(e)}"
+            )
+    
     def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding vector for text.
@@ -38,8 +259,28 @@ class EmbeddingService:
             List of floats representing the embedding vector
             
         Raises:
-            HTTPException: If model is not initialized
+            HTTPException: If the model could not be loaded
+        """
+        return self.generate_embedding_array(text).tolist()
+    
+    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Generate embedding vectors for many texts in batched forward passes.
+        Prefer this over looping generate_embedding: one encode call fills the GEMMs.
+        
+        Args:
+            texts: Input texts to embed
+            batch_size: Number of texts per model forward pass
+            
+        Returns:
+            Array of shape (len(texts), dim), one L2-normalized embedding per row
+            
+        Raises:
+            HTTPException: If the model could not be loaded
         """
+        # Load lazily if startup didn't (e.g. lifespan skipped in tests)
+        if self.model is None:
+            self.load_model()
         if self.model is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -47,13 +288,28 @@ class EmbeddingService:
             )
         
         try:
-            embedding = self.model.encode(text).tolist()
-            return embedding
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True  # unit length: cosine similarity is a plain dot product
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error generating embedding: {str(e)}"
+                detail=f"Error generating embeddings: {str(e)}"
             )
+    
+    async def aencode(self, text: str) -> np.ndarray:
+        """Async wrapper for generate_embedding_array that runs in the embedding thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.generate_embedding_array, text)
+    
+    async def aencode_many(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Async wrapper for generate_embeddings that runs in the embedding thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.generate_embeddings, texts, batch_size)
 
 
 # Global instance
@@ -2,22 +2,38 @@
 LangChain-based prompt management for ticket resolution.
 Loads prompt templates from separate files for easy modification.
 """
-from typing import Dict, List
+from collections import ChainMap
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Union
 from pathlib import Path
 from langchain_core.prompts import ChatPromptTemplate
+from app.models.similar_tickets import SimilarTickets
 
 
 # Base directory for prompt templates
 PROMPT_TEMPLATES_DIR = Path(__file__).parent / "prompt_templates"
 
+# Ticket fields injected into the prompt, with the value used when a field is missing
+# (read-only and shared by every request)
+TICKET_FIELD_DEFAULTS = MappingProxyType({
+    "title": "N/A",
+    "description": "N/A",
+    "category": "N/A",
+    "severity": "N/A",
+    "application": "N/A",
+    "environment": "N/A",
+    "affected_users": "N/A",
+})
 
-# Load a prompt template from a text file
+
+# Load a prompt template from a text file (read once per process)
+@lru_cache(maxsize=None)
 def load_template_file(filename: str) -> str:
-    """Load a prompt template from a text file."""
+    """Load a prompt template from a text file. Contents are cached after the first read."""
     template_path = PROMPT_TEMPLATES_DIR / filename
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return template_path.read_text(encoding='utf-8')
     except FileNotFoundError:
         raise FileNotFoundError(f"Prompt template not found: {template_path}")
 
@@ -35,7 +51,8 @@ class PromptConfig:
     
     # Context limits
     MAX_SIMILAR_TICKETS = 5
-    MAX_CONTEXT_LENGTH = 10000  # characters
+    MAX_CONTEXT_LENGTH = 10000  # characters of similar-ticket context sent to the LLM
+    MAX_FIELD_LENGTH = 2000  # characters kept per description/solution/reasoning
 
 
 class PromptTemplateManager:
@@ -45,36 +62,78 @@ class PromptTemplateManager:
         # Load message templates from files
         self.system_message = load_template_file("system_message.txt")
         self.human_message_template = load_template_file("human_message.txt")
+        self.task_instructions = load_template_file("task_instructions.txt")
         self.ai_example_message = load_template_file("ai_example_message.txt")
         
         # Load helper templates
         self.similar_ticket_item_template = load_template_file("similar_ticket_item.txt")
         self.no_similar_tickets_template = load_template_file("no_similar_tickets.txt")
+        
+        # Bound once so the per-request loop skips the attribute lookups
+        self._format_similar_ticket = self.similar_ticket_item_template.format_map
+        
+        # Chat prompts are static, so both variants are built once at import (keyed by include_example)
+        self._chat_prompts: Dict[bool, ChatPromptTemplate] = {
+            include_example: self.create_chat_prompt(include_example=include_example)
+            for include_example in (True, False)
+        }
     
-    def build_similar_tickets_context(self, similar_tickets: List[Dict]) -> str:
-        """Build the similar tickets context section."""
+    @staticmethod
+    def _clip_field(text: str) -> str:
+        """Truncate one long ticket field to MAX_FIELD_LENGTH characters."""
+        if len(text) <= PromptConfig.MAX_FIELD_LENGTH:
+            return text
+        return text[:PromptConfig.MAX_FIELD_LENGTH] + "…"
+    
+    def build_similar_tickets_context(self, similar_tickets: Union[SimilarTickets, List[Dict]]) -> str:
+        """Build the similar tickets context section (accepts SimilarTickets or a list of dicts)."""
+        if not isinstance(similar_tickets, SimilarTickets):
+            similar_tickets = SimilarTickets.from_dicts(similar_tickets)
         if not similar_tickets:
             return self.no_similar_tickets_template
         
-        # Build list of similar tickets
-        tickets_text = ""
-        for i, ticket in enumerate(similar_tickets, 1):
-            similarity_percent = f"{ticket['similarity_score'] * 100:.1f}"
-            tickets_text += self.similar_ticket_item_template.format(
-                number=i,
-                similarity_percent=similarity_percent,
-                title=ticket['title'],
-                description=ticket['description'],
-                solution=ticket['solution'],
-                reasoning=ticket['reasoning']
-            )
+        # Best matches first, so the character budget keeps the most relevant tickets
+        similar_tickets = similar_tickets.by_score()
+        
+        # Percentages for all tickets in one vectorized multiply
+        percents = (similar_tickets.scores[:PromptConfig.MAX_SIMILAR_TICKETS] * 100).tolist()
+        
+        # Greedily add tickets until the next one would exceed the context budget
+        format_item = self._format_similar_ticket
+        clip = self._clip_field
+        parts = []
+        total_len = 0
+        for i, percent in enumerate(percents):
+            item = format_item({
+                "number": i + 1,
+                "similarity_percent": f"{percent:.1f}",
+                "title": similar_tickets.titles[i],
+                "description": clip(similar_tickets.descriptions[i]),
+                "solution": clip(similar_tickets.solutions[i]),
+                "reasoning": clip(similar_tickets.reasonings[i])
+            })
+            if parts and total_len + len(item) > PromptConfig.MAX_CONTEXT_LENGTH:
+                break
+            parts.append(item)
+            total_len += len(item)
+        
+        # Joined once instead of repeated +=
+        tickets_text = "".join(parts)
         
         return f"### Similar Past Cloud Application Issues (85%+ match confidence):\n\n{tickets_text}"
     
+    def get_chat_prompt(self, include_example: bool = True) -> ChatPromptTemplate:
+        """Get the prebuilt chat prompt for a variant (no per-request from_messages parsing)."""
+        return self._chat_prompts[bool(include_example)]
+    
     def create_chat_prompt(self, include_example: bool = True) -> ChatPromptTemplate:
         """
         Create a LangChain ChatPromptTemplate with system, human, and optional AI example messages.
         
+        All static messages (system, few-shot example, task instructions) come first and
+        the per-ticket incident message comes last, so the provider can reuse the cached
+        prompt prefix across requests.
+        
         Args:
             include_example: Whether to include the AI example message (few-shot learning)
         
@@ -108,7 +167,10 @@ Provide root cause analysis and resolution."""
                 ("ai", self.ai_example_message)
             ])
         
-        # Add the actual human message template with variables
+        # Static task instructions and output format (no template variables)
+        messages.append(("human", self.task_instructions))
+        
+        # Per-ticket incident details and similar tickets go last
         messages.append(("human", self.human_message_template))
         
         return ChatPromptTemplate.from_messages(messages)
@@ -119,33 +181,40 @@ prompt_config = PromptConfig()
 prompt_manager = PromptTemplateManager()
 
 
-def get_ticket_resolution_prompt(ticket_data: Dict, similar_tickets: List[Dict], include_example: bool = True) -> ChatPromptTemplate:
+def get_ticket_resolution_prompt(ticket_data: Dict, similar_tickets: Union[SimilarTickets, List[Dict]], include_example: bool = True) -> Tuple[ChatPromptTemplate, Dict[str, str]]:
     """
     Create a LangChain ChatPromptTemplate for ticket resolution.
     
     Args:
         ticket_data: Current ticket information
-        similar_tickets: List of similar past tickets
+        similar_tickets: Similar past tickets (SimilarTickets or a list of dicts)
         include_example: Whether to include few-shot example (default: True)
     
     Returns:
-        ChatPromptTemplate with all variables populated except the final invocation
+        Tuple of (ChatPromptTemplate, variables to inject when the chain is invoked)
     """
-    # Build similar tickets context
-    similar_tickets_context = prompt_manager.build_similar_tickets_context(similar_tickets)
-    
-    # Create the chat prompt
-    chat_prompt = prompt_manager.create_chat_prompt(include_example=include_example)
+    # Reuse the prebuilt chat prompt; only the variables change per ticket
+    chat_prompt = prompt_manager.get_chat_prompt(include_example=include_example)
     
-    # Return the template with partial variables filled
     # The actual invocation will happen in the AI service
-    return chat_prompt, {
-        "title": ticket_data.get('title', 'N/A'),
-        "description": ticket_data.get('description', 'N/A'),
-        "category": ticket_data.get('category', 'N/A'),
-        "severity": ticket_data.get('severity', 'N/A'),
-        "application": ticket_data.get('application', 'N/A'),
-        "environment": ticket_data.get('environment', 'N/A'),
-        "affected_users": ticket_data.get('affected_users', 'N/A'),
-        "similar_tickets_context": similar_tickets_context
-    }
+    return chat_prompt, build_prompt_variables(ticket_data, similar_tickets)
+
+
+def build_prompt_variables(ticket_data: Dict, similar_tickets: Union[SimilarTickets, List[Dict]]) -> Dict[str, str]:
+    """
+    Build the per-ticket variables injected into the chat prompt.
+    
+    Args:
+        ticket_data: Current ticket information
+        similar_tickets: Similar past tickets (SimilarTickets or a list of dicts)
+    
+    Returns:
+        Dictionary of prompt variables
+    """
+    # Missing ticket fields fall through to the shared defaults
+    merged = ChainMap(ticket_data, TICKET_FIELD_DEFAULTS)
+    prompt_variables = {field: merged[field] for field in TICKET_FIELD_DEFAULTS}
+    
+    # Build similar tickets context
+    prompt_variables["similar_tickets_context"] = prompt_manager.build_similar_tickets_context(similar_tickets)
+    return prompt_variables
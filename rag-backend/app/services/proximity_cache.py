@@ -0,0 +1,130 @@
+"""
+Approximate (proximity) cache for similar-ticket lookups.
+Reuses a previous vector search result when a new query embedding lies
+within a small cosine distance of a cached one, skipping the Weaviate query.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.models import SimilarTickets
+
+try:
+    import simsimd  # Optional: SIMD (AVX-512/NEON) distance kernels
+except ImportError:
+    simsimd = None
+
+
+class ProximityCache:
+    """
+    LRU cache of SimilarTickets results keyed by (collection, query embedding).
+    The AI service reuses the same structure for its semantic answer cache.
+    """
+    
+    def __init__(self, capacity: int = 1024, tolerance: float = 0.05):
+        """
+        Args:
+            capacity: Maximum number of cached query embeddings (LRU eviction)
+            tolerance: Maximum cosine distance for a cached embedding to count as a hit
+        """
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[np.ndarray, SimilarTickets]]" = OrderedDict()
+        # Stacked embeddings per collection, rebuilt lazily after inserts/evictions
+        self._matrices: Dict[str, Tuple[np.ndarray, List[Tuple[str, bytes]]]] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Return the embedding as a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.sqrt(np.vdot(vector, vector))  # cheaper than np.linalg.norm's axis/ord dispatch
+        return vector / norm if norm > 0 else vector
+    
+    @staticmethod
+    def _cosine_distances(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Cosine distance from a unit query to each (unit) row: SimSIMD if installed, else one matrix-vector product."""
+        if simsimd is not None:
+            return np.asarray(simsimd.cdist(query[None, :], matrix, metric="cosine")).ravel()
+        return 1.0 - matrix @ query
+    
+    def _matrix_for(self, collection_name: str) -> Tuple[np.ndarray, List[Tuple[str, bytes]]]:
+        """Get (or build) the (N, d) matrix of cached embeddings for a collection."""
+        cached = self._matrices.get(collection_name)
+        if cached is None:
+            keys = [key for key in self._entries if key[0] == collection_name]
+            matrix = np.stack([self._entries[key][0] for key in keys]) if keys else None
+            cached = (matrix, keys)
+            self._matrices[collection_name] = cached
+        return cached
+    
+    def lookup(self, collection_name: str, query_embedding) -> Optional[SimilarTickets]:
+        """
+        Find a cached result whose query embedding is within tolerance.
+        
+        Args:
+            collection_name: Collection the search runs against
+            query_embedding: Embedding of the current query
+        
+        Returns:
+            Cached SimilarTickets on a hit, otherwise None
+        """
+        query = self._normalize(query_embedding)
+        
+        with self._lock:
+            matrix, keys = self._matrix_for(collection_name)
+            if matrix is None:
+                return None
+            
+            # Cosine distance to every cached key in one call
+            distances = self._cosine_distances(query, matrix)
+            best = int(np.argmin(distances))
+            if distances[best] > self.tolerance:
+                return None
+            
+            key = keys[best]
+            self._entries.move_to_end(key)
+            return self._entries[key][1]
+    
+    def insert(self, collection_name: str, query_embedding, similar_tickets: SimilarTickets):
+        """Cache the SimilarTickets found for a query embedding."""
+        query = self._normalize(query_embedding)
+        key = (collection_name, query.tobytes())
+        
+        with self._lock:
+            self._entries[key] = (query, similar_tickets)
+            self._entries.move_to_end(key)
+            self._matrices.pop(collection_name, None)
+            
+            # Evict least recently used entries beyond capacity
+            while len(self._entries) > self.capacity:
+                (evicted_collection, _), _ = self._entries.popitem(last=False)
+                self._matrices.pop(evicted_collection, None)
+    
+    def invalidate(self, collection_name: Optional[str] = None):
+        """Drop cached results for a collection (or everything) after its data changes."""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+                self._matrices.clear()
+                return
+            
+            for key in [key for key in self._entries if key[0] == collection_name]:
+                del self._entries[key]
+            self._matrices.pop(collection_name, None)
+
+
+# Global instance
+proximity_cache = ProximityCache(
+    capacity=settings.PROXIMITY_CACHE_SIZE,
+    tolerance=settings.PROXIMITY_CACHE_TOLERANCE
+)
+
+
+def get_proximity_cache() -> ProximityCache:
+    """
+    Dependency function to get the proximity cache.
+    Used by FastAPI endpoints.
+    """
+    return proximity_cache
@@ -0,0 +1,78 @@
+"""
+Exact-match response cache for AI ticket resolution.
+Identical ticket submissions reuse the previous AITicketResponse, skipping
+embedding, vector search and the LLM call.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+from cachetools import TTLCache
+from app.core.config import settings
+
+
+class ResponseCache:
+    """TTL-bounded LRU of AI responses keyed by a hash of the normalized submission."""
+    
+    def __init__(self, maxsize: int = 2048, ttl: int = 3600, enabled: bool = True):
+        """
+        Args:
+            maxsize: Maximum number of cached responses
+            ttl: Seconds a cached response stays valid
+            enabled: When False, get() always misses and set() stores nothing
+        """
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # clear() runs from threadpool endpoints while get/set run on the event loop,
+        # and TTLCache mutates (expires entries) even on reads
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(fields: Dict[str, Any]) -> str:
+        """Build a stable cache key from the submission fields (whitespace-normalized)."""
+        normalized = {
+            name: " ".join(value.split()) if isinstance(value, str) else value
+            for name, value in fields.items()
+        }
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for a key, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._cache.get(key)
+    
+    def set(self, key: str, response: Any):
+        """Store a response under a key."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._cache[key] = response
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+    
+    def clear(self) -> int:
+        """Drop all cached responses. Returns how many were removed."""
+        with self._lock:
+            removed = len(self._cache)
+            self._cache.clear()
+        return removed
+
+
+# Global instance
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL,
+    enabled=settings.LLM_ANSWER_CACHING  # same temperature gate as the AI answer caches
+)
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Dependency function to get the response cache.
+    Used by FastAPI endpoints.
+    """
+    return response_cache
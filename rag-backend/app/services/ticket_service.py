@@ -2,23 +2,69 @@
 Ticket service for business logic related to ticket operations.
 Handles ticket search, retrieval, and similarity matching.
 """
-from typing import List, Dict, Optional
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Union
+import numpy as np
 import weaviate.classes as wvc
 from app.core.config import settings
+from app.db import distance_to_similarity, is_collection_not_found, similarity_to_distance, weaviate_manager
+from app.models import SimilarTickets
 from app.services.embedding_service import embedding_service
 
+logger = logging.getLogger(__name__)
+
+# Ticket properties copied into SimilarTickets (in column order) and their defaults
+_SIMILAR_TICKET_DEFAULTS = {
+    "ticket_id": "N/A",
+    "title": "",
+    "description": "",
+    "solution": "",
+    "reasoning": "",
+    "category": "",
+    "severity": "",
+}
+_SIMILAR_TICKET_FIELDS = tuple(_SIMILAR_TICKET_DEFAULTS)
+_get_similar_ticket_fields = itemgetter(*_SIMILAR_TICKET_FIELDS)
+
 
 class TicketService:
     """Service for ticket-related operations."""
     
+    def __init__(self):
+        # Threads for blocking Weaviate calls made from async endpoints (I/O-bound gRPC)
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.RETRIEVAL_WORKERS,
+            thread_name_prefix="retrieval"
+        )
+        # Next ticket number per collection, seeded once from a count aggregation
+        self._next_ids: Dict[str, int] = {}
+        self._id_counter_lock = threading.Lock()
+    
+    @staticmethod
+    def _get_collection(weaviate_client, collection_name: str):
+        """Collection handle, from WeaviateManager's handle cache when using the shared client."""
+        if weaviate_client is weaviate_manager.client:
+            return weaviate_manager.get_collection(collection_name)
+        return weaviate_client.collections.get(collection_name)
+    
+    def shutdown(self):
+        """Shut down the retrieval thread pool."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
     def find_similar_tickets(
         self,
         weaviate_client,
         collection_name: str,
         query_text: str,
         k: int = 5,
-        similarity_threshold: float = 0.85
-    ) -> List[Dict]:
+        similarity_threshold: float = 0.85,
+        precomputed_vector: Optional[Union[np.ndarray, List[float]]] = None
+    ) -> SimilarTickets:
         """
         Find similar tickets in Weaviate using vector similarity search.
         
@@ -28,74 +74,185 @@ class TicketService:
             query_text: Query text to search for
             k: Number of results to return
             similarity_threshold: Minimum similarity score (0-1)
+            precomputed_vector: Query embedding, if the caller already computed it
             
         Returns:
-            List of similar tickets with metadata and similarity scores
+            SimilarTickets columns (metadata and similarity scores), best match first
+            
+        Raises:
+            Exception: The Weaviate error, if the collection does not exist
         """
         if weaviate_client is None:
-            return []
+            return SimilarTickets()
         
         try:
-            # Check if collection exists
-            if not weaviate_client.collections.exists(collection_name):
-                return []
+            # Get collection handle (no exists() round-trip; a missing collection fails the search)
+            collection = self._get_collection(weaviate_client, collection_name)
             
-            # Get collection
-            collection = weaviate_client.collections.get(collection_name)
+            # Generate embedding for query (unless the caller already did)
+            if precomputed_vector is not None:
+                query_embedding = precomputed_vector
+            else:
+                query_embedding = embedding_service.generate_embedding_array(query_text)
             
-            # Generate embedding for query
-            query_embedding = embedding_service.generate_embedding(query_text)
-            
-            # Perform vector search
+            # Perform vector search; Weaviate drops results below the threshold server-side.
+            # Filter and score by distance: certainty only exists for the cosine metric.
             response = collection.query.near_vector(
                 near_vector=query_embedding,
                 limit=k,
-                return_metadata=wvc.query.MetadataQuery(distance=True, certainty=True)
+                distance=similarity_to_distance(similarity_threshold),
+                return_properties=list(_SIMILAR_TICKET_FIELDS),  # only what SimilarTickets keeps
+                return_metadata=wvc.query.MetadataQuery(distance=True)
             )
-            
-            # Extract results with similarity filtering
-            similar_tickets = []
-            for obj in response.objects:
-                # Weaviate certainty is already 0-1 (cosine similarity)
-                similarity_score = obj.metadata.certainty
-                
-                # Only include tickets above threshold
-                if similarity_score >= similarity_threshold:
-                    ticket_data = {
-                        "ticket_id": obj.properties.get("ticket_id", "N/A"),
-                        "title": obj.properties.get("title", ""),
-                        "description": obj.properties.get("description", ""),
-                        "solution": obj.properties.get("solution", ""),
-                        "reasoning": obj.properties.get("reasoning", ""),
-                        "category": obj.properties.get("category", ""),
-                        "severity": obj.properties.get("severity", ""),
-                        "similarity_score": float(similarity_score)
-                    }
-                    similar_tickets.append(ticket_data)
-            
-            return similar_tickets
-            
         except Exception as e:
-            print(f"Error finding similar tickets: {e}")
+            # Let callers turn a missing collection into a 404
+            if is_collection_not_found(e):
+                raise
+            logger.exception("Weaviate near_vector failed for collection=%s", collection_name)
+            return SimilarTickets()
+        
+        # Extraction stays outside the try: a bug here should surface, not read as "no matches"
+        objects = response.objects
+        distances = np.fromiter(
+            (obj.metadata.distance for obj in objects),
+            dtype=np.float64,
+            count=len(objects)
+        )
+        # 0-1 similarity (same scale as Weaviate certainty)
+        scores = distance_to_similarity(distances)
+        
+        # One C-level itemgetter call per row (falling back to defaults for missing
+        # properties), then transpose the rows into columns
+        rows = [
+            _get_similar_ticket_fields(properties)
+            if properties.keys() >= _SIMILAR_TICKET_DEFAULTS.keys()
+            else tuple(properties.get(name, default) for name, default in _SIMILAR_TICKET_DEFAULTS.items())
+            for properties in (obj.properties for obj in objects)
+        ]
+        columns = [list(column) for column in zip(*rows)] or [[] for _ in _SIMILAR_TICKET_FIELDS]
+        ticket_ids, titles, descriptions, solutions, reasonings, categories, severities = columns
+        
+        return SimilarTickets(
+            ticket_ids=ticket_ids,
+            titles=titles,
+            descriptions=descriptions,
+            solutions=solutions,
+            reasonings=reasonings,
+            categories=categories,
+            severities=severities,
+            scores=scores
+        )
+    
+    async def afind_similar_tickets_batch(
+        self,
+        weaviate_client,
+        collection_name: str,
+        query_texts: List[str],
+        k: int = 5,
+        similarity_threshold: float = 0.85
+    ) -> List[SimilarTickets]:
+        """
+        Find similar tickets for many queries: one batched encode in the embedding
+        pool, then the vector searches run concurrently on the retrieval pool.
+        
+        Args:
+            weaviate_client: Weaviate client instance
+            collection_name: Name of the collection to search
+            query_texts: Query texts to search for
+            k: Number of results to return per query
+            similarity_threshold: Minimum similarity score (0-1)
+            
+        Returns:
+            One SimilarTickets result per query, in input order
+        """
+        if not query_texts:
             return []
+        
+        query_embeddings = await embedding_service.aencode_many(query_texts)
+        return list(await asyncio.gather(*(
+            self.afind_similar_tickets(
+                weaviate_client=weaviate_client,
+                collection_name=collection_name,
+                query_text=query_text,
+                k=k,
+                similarity_threshold=similarity_threshold,
+                precomputed_vector=query_embedding
+            )
+            for query_text, query_embedding in zip(query_texts, query_embeddings)
+        )))
     
-    def format_similar_tickets_for_response(self, similar_tickets: List[Dict]) -> List[Dict]:
-        """Format similar tickets for API response."""
-        return [
-            {
-                "ticket_id": st["ticket_id"],
-                "title": st["title"],
-                "similarity_score": st["similarity_score"],
-                "similarity_percent": f"{st['similarity_score'] * 100:.1f}%",
-                "category": st["category"],
-                "severity": st["severity"]
+    async def afind_similar_tickets(self, **kwargs) -> SimilarTickets:
+        """Async wrapper for find_similar_tickets that runs on the retrieval thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self.find_similar_tickets, **kwargs))
+    
+    async def agenerate_ticket_id(self, **kwargs) -> str:
+        """Async wrapper for generate_ticket_id that runs on the retrieval thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self.generate_ticket_id, **kwargs))
+    
+    async def apeek_ticket_id(self, **kwargs) -> str:
+        """Async wrapper for peek_ticket_id that runs on the retrieval thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self.peek_ticket_id, **kwargs))
+    
+    def iter_similar_tickets_for_response(self, similar_tickets: SimilarTickets) -> Iterator[Dict]:
+        """Yield similar tickets formatted for the API one at a time (for streamed JSON bodies)."""
+        for ticket_id, title, score, percent, category, severity in zip(
+            similar_tickets.ticket_ids,
+            similar_tickets.titles,
+            similar_tickets.scores.tolist(),
+            similar_tickets.similarity_percents,
+            similar_tickets.categories,
+            similar_tickets.severities
+        ):
+            yield {
+                "ticket_id": ticket_id,
+                "title": title,
+                "similarity_score": score,
+                "similarity_percent": percent,
+                "category": category,
+                "severity": severity
             }
-            for st in similar_tickets
-        ]
+    
+    def format_similar_tickets_for_response(self, similar_tickets: SimilarTickets) -> List[Dict]:
+        """Format similar tickets for API response (a projection of precomputed columns)."""
+        return list(self.iter_similar_tickets_for_response(similar_tickets))
+    
+    def _next_ticket_number(self, weaviate_client, collection_name: str, advance: bool) -> Optional[int]:
+        """
+        Next ticket number for a collection, seeded from the collection count on first use.
+        The seed aggregation runs outside the lock, so a cold collection doesn't stall
+        ID generation for the others. Returns None if the count can't be fetched.
+        """
+        with self._id_counter_lock:
+            number = self._next_ids.get(collection_name)
+            if number is not None:
+                if advance:
+                    self._next_ids[collection_name] = number + 1
+                return number
+        
+        try:
+            collection = self._get_collection(weaviate_client, collection_name)
+            ticket_count = collection.aggregate.over_all(total_count=True).total_count
+        except Exception:
+            # Don't pin a guessed seed - retry the aggregation next time
+            logger.exception("Ticket count aggregation failed for collection=%s", collection_name)
+            return None
+        
+        with self._id_counter_lock:
+            # Another thread may have seeded (and advanced) it meanwhile - keep its value
+            number = self._next_ids.setdefault(collection_name, ticket_count + 1)
+            if advance:
+                self._next_ids[collection_name] = number + 1
+            return number
     
     def generate_ticket_id(self, weaviate_client, collection_name: str, prefix: str = "TKT") -> str:
         """
-        Generate a new ticket ID based on current collection count.
+        Generate a new ticket ID from a per-collection counter.
+        The counter is seeded from the collection count on first use (one
+        aggregation), then incremented locally, so concurrent requests get
+        distinct IDs without another Weaviate round-trip.
         
         Args:
             weaviate_client: Weaviate client instance
@@ -105,13 +262,32 @@ class TicketService:
         Returns:
             Generated ticket ID (e.g., "TKT-0001")
         """
-        try:
-            collection = weaviate_client.collections.get(collection_name)
-            count_result = collection.aggregate.over_all(total_count=True)
-            ticket_count = count_result.total_count
-            return f"{prefix}-{ticket_count + 1:04d}"
-        except Exception:
-            return f"{prefix}-0001"
+        number = self._next_ticket_number(weaviate_client, collection_name, advance=True)
+        return f"{prefix}-{number or 1:04d}"
+    
+    def peek_ticket_id(self, weaviate_client, collection_name: str, prefix: str = "TKT-PREVIEW") -> str:
+        """
+        The ID the next generated ticket would get (collection count + 1 until IDs
+        are issued), without consuming it - for previews of unsaved tickets.
+        
+        Args:
+            weaviate_client: Weaviate client instance
+            collection_name: Name of the collection
+            prefix: Prefix for the ticket ID
+            
+        Returns:
+            Preview ticket ID (e.g., "TKT-PREVIEW-0001")
+        """
+        number = self._next_ticket_number(weaviate_client, collection_name, advance=False)
+        return f"{prefix}-{number or 1:04d}"
+    
+    def reset_ticket_counter(self, collection_name: Optional[str] = None):
+        """Reseed ticket IDs from Weaviate on next use (call after a collection's tickets change)."""
+        with self._id_counter_lock:
+            if collection_name is None:
+                self._next_ids.clear()
+            else:
+                self._next_ids.pop(collection_name, None)
 
 
 # Global instance
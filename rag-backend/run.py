@@ -7,11 +7,25 @@ import uvicorn # Uvicorn is an ASGI server for running FastAPI apps
 from app.core.config import settings
 
 if __name__ == "__main__":
-    # Run the FastAPI application with Uvicorn server
-    uvicorn.run(
-        "app.main:app",           # Import string format (required for reload)
-        host="0.0.0.0",           # Listen on all interfaces
-        port=settings.API_PORT,   # Application port from config
-        log_level="info",         # Set logging level
-        reload=True               # Enable auto-reload for development
-    )
+    if settings.ENV == "production":
+        # Production: uvloop + httptools (both from uvicorn[standard]), no reload
+        uvicorn.run(
+            "app.main:app",               # Import string format (required for workers)
+            host="0.0.0.0",               # Listen on all interfaces
+            port=settings.API_PORT,       # Application port from config
+            loop="uvloop",                # libuv-based event loop
+            http="httptools",             # C HTTP parser instead of h11
+            workers=settings.API_WORKERS, # 1 by default - in-process caches aren't shared between workers
+            log_level="warning",          # Keep per-request noise out of the logs
+            access_log=False              # Skip the access log line on every request
+        )
+    else:
+        # Run the FastAPI application with Uvicorn server
+        uvicorn.run(
+            "app.main:app",           # Import string format (required for reload)
+            host="0.0.0.0",           # Listen on all interfaces
+            port=settings.API_PORT,   # Application port from config
+            log_level="info",         # Set logging level
+            loop="auto",              # uvloop when installed (uvicorn[standard]), else asyncio
+            reload=True               # Enable auto-reload for development
+        )
@@ -2,12 +2,15 @@
 Quick test to verify LangChain prompt templates are working correctly.
 Run this to test the new prompt structure without calling the API.
 """
+import inspect
 import sys
 from pathlib import Path
 
 # Add the app directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from langchain_core.prompts import ChatPromptTemplate
+from app.services import prompts
 from app.services.prompts import get_ticket_resolution_prompt, prompt_manager
 
 
@@ -71,10 +74,46 @@ def test_prompt_template():
     )
     
     print(f"\n📝 Without example: {len(chat_prompt_no_ex.messages)} messages")
-    print("   (System + Human only)")
+    print("   (System + Task instructions + Incident)")
     
     print("\n✅ All tests passed! Ready to use with Groq API.")
 
 
+def test_single_prompt_definition():
+    """Guard against a second get_ticket_resolution_prompt silently overriding the first."""
+    
+    # Exactly one definition in the prompts module
+    source = inspect.getsource(prompts)
+    assert source.count("def get_ticket_resolution_prompt(") == 1
+    assert source.count("class PromptTemplateManager") == 1
+    
+    # It is the LangChain version returning (ChatPromptTemplate, variables)
+    params = list(inspect.signature(get_ticket_resolution_prompt).parameters)
+    assert params == ["ticket_data", "similar_tickets", "include_example"]
+    
+    chat_prompt, variables = get_ticket_resolution_prompt({"title": "t"}, [])
+    assert isinstance(chat_prompt, ChatPromptTemplate)
+    assert set(chat_prompt.input_variables) <= set(variables)
+    
+    print("✅ Single LangChain get_ticket_resolution_prompt definition")
+
+
+def test_chat_prompts_prebuilt():
+    """Both prompt variants are built once at import and reused for every ticket."""
+    
+    with_example, _ = get_ticket_resolution_prompt({"title": "a"}, [], include_example=True)
+    again, _ = get_ticket_resolution_prompt({"title": "b"}, [], include_example=True)
+    without_example, _ = get_ticket_resolution_prompt({"title": "a"}, [], include_example=False)
+    
+    assert with_example is again
+    assert with_example is prompt_manager.get_chat_prompt(include_example=True)
+    assert without_example is prompt_manager.get_chat_prompt(include_example=False)
+    assert len(with_example.messages) == len(without_example.messages) + 2
+    
+    print("✅ Chat prompt variants are prebuilt and reused")
+
+
 if __name__ == "__main__":
     test_prompt_template()
+    test_single_prompt_definition()
+    test_chat_prompts_prebuilt()
@@ -2,6 +2,9 @@
 Standalone test to verify LangChain prompt templates structure.
 Tests file loading and template formatting without API calls.
 """
+import os
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 from langchain_core.prompts import ChatPromptTemplate
 
@@ -10,11 +13,10 @@ from langchain_core.prompts import ChatPromptTemplate
 PROMPT_TEMPLATES_DIR = Path(__file__).parent / "app" / "services" / "prompt_templates"
 
 
+@lru_cache(maxsize=None)
 def load_template_file(filename: str) -> str:
-    """Load a prompt template from a text file."""
-    template_path = PROMPT_TEMPLATES_DIR / filename
-    with open(template_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    """Load a prompt template from a text file (read once, then cached)."""
+    return (PROMPT_TEMPLATES_DIR / filename).read_text(encoding='utf-8')
 
 
 def test_prompt_files():
@@ -27,30 +29,38 @@ def test_prompt_files():
     required_files = [
         "system_message.txt",
         "human_message.txt",
+        "task_instructions.txt",
         "ai_example_message.txt",
         "similar_ticket_item.txt",
         "no_similar_tickets.txt"
     ]
     
     print("\n📁 Checking template files...")
-    for filename in required_files:
-        try:
-            content = load_template_file(filename)
-            preview = content[:80].replace('\n', ' ') + "..."
-            print(f"   ✅ {filename}: {len(content)} chars")
-            print(f"      Preview: {preview}")
-        except FileNotFoundError:
+    # One directory read instead of a stat/open attempt per file
+    with os.scandir(PROMPT_TEMPLATES_DIR) as entries:
+        present = {entry.name for entry in entries if entry.is_file()}
+    missing = [filename for filename in required_files if filename not in present]
+    if missing:
+        for filename in missing:
             print(f"   ❌ {filename}: NOT FOUND")
-            return False
+        return False
+    
+    # Everything exists, so load all templates in one pass
+    templates = {filename: load_template_file(filename) for filename in required_files}
+    for filename, content in templates.items():
+        preview = content[:80].replace('\n', ' ') + "..."
+        print(f"   ✅ {filename}: {len(content)} chars")
+        print(f"      Preview: {preview}")
     
     print("\n" + "=" * 80)
     print("Creating ChatPromptTemplate...")
     print("=" * 80)
     
     # Load templates
-    system_msg = load_template_file("system_message.txt")
-    human_msg = load_template_file("human_message.txt")
-    ai_example_msg = load_template_file("ai_example_message.txt")
+    system_msg = templates["system_message.txt"]
+    human_msg = templates["human_message.txt"]
+    task_msg = templates["task_instructions.txt"]
+    ai_example_msg = templates["ai_example_message.txt"]
     
     # Create example human message for few-shot
     example_human = """### Current Incident Details:
@@ -73,6 +83,7 @@ Provide analysis."""
         ("system", system_msg),
         ("human", example_human),
         ("ai", ai_example_msg),
+        ("human", task_msg),
         ("human", human_msg)
     ])
     
@@ -115,7 +126,8 @@ def test_similar_tickets_formatting():
         'reasoning': 'Connection pool was exhausted'
     }
     
-    formatted = item_template.format(**sample_ticket)
+    # format_map reads the dict directly; missing fields render as ""
+    formatted = item_template.format_map(defaultdict(str, sample_ticket))
     print(f"\n✅ Similar ticket item formatted:")
     print(formatted[:200] + "...")
     
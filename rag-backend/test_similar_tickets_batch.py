@@ -0,0 +1,88 @@
+"""
+Quick test for the batched similar-ticket lookup (POST /api/v1/tickets/similar/batch).
+Uses a fake Weaviate client and a fake encoder, so no database or model is needed.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the app directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import tickets
+from app.services.embedding_service import embedding_service
+
+
+class FakeQuery:
+    """Returns one ticket per query; the query vector picks which one."""
+    
+    def near_vector(self, near_vector, limit, distance, return_properties, return_metadata):
+        number = int(near_vector[0])
+        ticket = SimpleNamespace(
+            properties={
+                "ticket_id": f"TKT-{number:04d}",
+                "title": f"Ticket {number}",
+                "description": "",
+                "solution": "",
+                "reasoning": "",
+                "category": "Application",
+                "severity": "High"
+            },
+            metadata=SimpleNamespace(distance=0.1)
+        )
+        return SimpleNamespace(objects=[ticket])
+
+
+class FakeClient:
+    def __init__(self):
+        self.collections = SimpleNamespace(get=lambda name: SimpleNamespace(query=FakeQuery()))
+
+
+def _client(monkeypatch):
+    encoded = []
+    
+    async def fake_aencode_many(texts):
+        encoded.append(list(texts))
+        return [[float(i + 1)] for i in range(len(texts))]
+    
+    monkeypatch.setattr(tickets, "get_weaviate_client", FakeClient)
+    monkeypatch.setattr(embedding_service, "aencode_many", fake_aencode_many)
+    app = FastAPI()
+    app.include_router(tickets.router)
+    return TestClient(app), encoded
+
+
+def test_similar_tickets_batch(monkeypatch):
+    """All queries are encoded in one call and results come back in input order."""
+    client, encoded = _client(monkeypatch)
+    
+    queries = ["login fails", "disk full", "timeout on checkout"]
+    response = client.post("/api/v1/tickets/similar/batch", json=queries)
+    
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert encoded == [queries], "queries should be embedded in a single batch"
+    assert [result["query"] for result in body["results"]] == queries
+    assert [result["similar_tickets"][0]["ticket_id"] for result in body["results"]] == [
+        "TKT-0001", "TKT-0002", "TKT-0003"
+    ]
+    print("✅ Batch lookup returns one result list per query, in order")
+
+
+def test_similar_tickets_batch_limit(monkeypatch):
+    """Oversized batches are rejected before anything is embedded."""
+    client, encoded = _client(monkeypatch)
+    
+    queries = ["q"] * (tickets.MAX_BATCH_QUERIES + 1)
+    response = client.post("/api/v1/tickets/similar/batch", json=queries)
+    
+    assert response.status_code == 400
+    assert encoded == []
+    print("✅ Oversized batch rejected with 400")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))